@@ -0,0 +1,308 @@
+import csv
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import generator
+import puzzle
+from logic import (BACKENDS, And, Biconditional, KnowledgeBase, Not, Or, Symbol,
+                   compiled_model_check, parallel_model_check)
+
+# Entailment checkers to compare, by name, the original first
+CHECKERS = [("recursive", BACKENDS["recursive"])] + [
+    (name, checker) for name, checker in BACKENDS.items()
+    if name != "recursive"
+]
+
+
+def time_checker(checker, knowledge, queries, repeat):
+    """
+    Returns the answers a checker gives for each query
+    and the mean seconds it takes to answer them all.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        answers = [checker(knowledge, query) for query in queries]
+    return answers, (time.perf_counter() - start) / repeat
+
+
+def time_knowledge_base(knowledge, queries, repeat):
+    """
+    Returns the answers a KnowledgeBase of knowledge's conjuncts gives
+    for each query and the mean seconds it takes to build it and
+    answer them all.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        base = KnowledgeBase(*knowledge.conjuncts)
+        answers = [base.ask(query) for query in queries]
+    return answers, (time.perf_counter() - start) / repeat
+
+
+def padded(knowledge, count):
+    """
+    Returns a knowledge base that adds count symbols, each only
+    known to be true or false, to knowledge.
+    """
+    extra = [Symbol(f"X{i}") for i in range(count)]
+    return And(knowledge, *[Or(x, Not(x)) for x in extra])
+
+
+def benchmark_scale(most):
+    """
+    Times every checker but the recursive one on puzzle 3 padded
+    with extra symbols, up to most symbols in all.
+    """
+    checkers = [(name, checker) for name, checker in CHECKERS
+                if name != "recursive"]
+    print(f"{'symbols':>8}" + "".join(f"{name:>14}" for name, _ in checkers))
+    for count in range(10, most + 1, 2):
+        knowledge = padded(puzzle.knowledge3, count - 6)
+        line = f"{count:>8}"
+        answers = set()
+        for name, checker in checkers:
+            # The compiled checker's time doubles with every symbol
+            if name == "compiled" and count > 20:
+                line += f"{'-':>14}"
+                continue
+            start = time.perf_counter()
+            answers.add(checker(knowledge, puzzle.AKnight))
+            line += f"{1000 * (time.perf_counter() - start):>11.1f} ms"
+        if len(answers) != 1:
+            sys.exit(f"Checkers disagree with {count} symbols")
+        print(line)
+
+
+def build_knowledge(count):
+    """
+    Returns a knowledge base about count characters, each of whom says
+    of every other "we are the same kind", building every symbol and
+    subformula afresh wherever it appears, as a generator would.
+    """
+    def knight(i):
+        return Symbol(f"{i} is a Knight")
+
+    def knave(i):
+        return Symbol(f"{i} is a Knave")
+
+    sentences = []
+    for i in range(count):
+        sentences.append(Or(knight(i), knave(i)))
+        sentences.append(Not(And(knight(i), knave(i))))
+        for j in range(count):
+            if i != j:
+                same = Or(And(knight(i), knight(j)), And(knave(i), knave(j)))
+                sentences.append(Biconditional(knight(i), same))
+    return And(*sentences)
+
+
+def benchmark_build(count, repeat=100):
+    """
+    Reports the time and memory it takes to build a knowledge base
+    about count characters, then to build it again while the first
+    copy is still around, and to hash it and list its symbols.
+    """
+    # Time the builds first, as tracing memory slows them down
+    times = []
+    copies = []
+    for _ in range(2):
+        start = time.perf_counter()
+        copies.append(build_knowledge(count))
+        times.append(time.perf_counter() - start)
+    copies.clear()
+
+    for label, elapsed in zip(["first copy", "second copy"], times):
+        tracemalloc.start()
+        try:
+            copies.append(build_knowledge(count))
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        print(f"{label:>12}: {1000 * elapsed:>8.1f} ms {size / 1024:>8.0f} KB")
+
+    knowledge = copies[0]
+    for name, operation in [("hash", hash), ("symbols", And.symbols)]:
+        start = time.perf_counter()
+        operation(knowledge)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            operation(knowledge)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{name:>12}: {1000 * first:>8.3f} ms first, "
+              f"{1000 * elapsed:.3f} ms after")
+
+
+def ring_puzzle(count):
+    """
+    Returns a knowledge base about count characters sitting in a ring,
+    each of whom says "the next one is a knave", and the symbols that
+    say the first one is a knight and a knave.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(count)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(count)]
+    sentences = []
+    for i in range(count):
+        sentences.append(Or(knights[i], knaves[i]))
+        sentences.append(Not(And(knights[i], knaves[i])))
+        sentences.append(Biconditional(knights[i], knaves[(i + 1) % count]))
+    return And(*sentences), knights[0], knaves[0]
+
+
+def benchmark_parallel(most, worker_counts):
+    """
+    Times compiled_model_check and parallel_model_check with each
+    number of workers on ring puzzles with up to most characters.
+    The query "the first is a knight or a knave" is entailed, so every
+    model is checked; "the first is a knight" is not, so the parallel
+    checker stops early.
+    """
+    print(f"{'symbols':>8} {'query':>8}{'compiled':>12}"
+          + "".join(f"{f'{workers} workers':>12}" for workers in worker_counts))
+    for count in range(8, most + 1):
+        knowledge, knight, knave = ring_puzzle(count)
+        for label, query in [("entailed", Or(knight, knave)), ("not", knight)]:
+            start = time.perf_counter()
+            expected = compiled_model_check(knowledge, query)
+            line = f"{2 * count:>8} {label:>8}"
+            line += f"{1000 * (time.perf_counter() - start):>9.0f} ms"
+            for workers in worker_counts:
+                start = time.perf_counter()
+                answer = parallel_model_check(knowledge, query, workers)
+                line += f"{1000 * (time.perf_counter() - start):>9.0f} ms"
+                if answer != expected:
+                    sys.exit(f"Parallel checker is wrong with {count} characters")
+            print(line)
+
+
+# Most symbols each backend is given in the suite, as all but the
+# knowledge base and SAT backends take time exponential in them
+SUITE_LIMITS = {
+    "recursive": 12,
+    "compiled": 18,
+    "parallel": 18,
+    "vectorized": 24,
+    "kb": 32,
+    "sat": None,
+}
+
+
+def benchmark_suite(most, path, puzzles=3, seed=50):
+    """
+    Times every backend on puzzles random puzzles for each number of
+    characters from 2 up to most, each with as many statements as
+    characters, asking about every symbol. Checks that the backends
+    agree and writes a row per backend and puzzle to a CSV file at path.
+    """
+    rng = random.Random(seed)
+    names = [name for name in SUITE_LIMITS if name == "kb" or name in BACKENDS]
+    rows = []
+    print(f"{'characters':>10}" + "".join(f"{name:>14}" for name in names))
+    for characters in range(2, most + 1):
+        totals = {}
+        for number in range(puzzles):
+            knowledge, symbols = generator.generate(characters, characters,
+                                                    rng=rng)
+            answers = None
+            for name in names:
+                limit = SUITE_LIMITS[name]
+                if limit is not None and len(symbols) > limit:
+                    continue
+                if name == "kb":
+                    answer, elapsed = time_knowledge_base(knowledge, symbols, 1)
+                else:
+                    answer, elapsed = time_checker(BACKENDS[name], knowledge,
+                                                   symbols, 1)
+                if answers is None:
+                    answers = answer
+                elif answer != answers:
+                    sys.exit(f"{name} disagrees on puzzle {number} "
+                             f"with {characters} characters")
+                totals[name] = totals.get(name, 0) + elapsed
+                rows.append([characters, characters, len(symbols), number,
+                             name, f"{elapsed:.6f}", sum(answer)])
+
+        print(f"{characters:>10}" + "".join(
+            f"{1000 * totals[name] / puzzles:>11.2f} ms" if name in totals
+            else f"{'-':>14}" for name in names))
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["characters", "statements", "symbols", "puzzle",
+                         "backend", "seconds", "entailed"])
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {path}")
+
+
+def benchmark_puzzles(repeat):
+    """
+    Times every checker on each puzzle in puzzle.py, asking about
+    every symbol, and checks that they agree. The kb column builds a
+    KnowledgeBase once per puzzle and asks it every question. The last puzzle is
+    puzzle 3 padded with ten symbols it says nothing about, to show
+    how the checkers scale with the number of models.
+    """
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [
+        ("0", puzzle.knowledge0),
+        ("1", puzzle.knowledge1),
+        ("2", puzzle.knowledge2),
+        ("3", puzzle.knowledge3),
+        ("3 + 10", padded(puzzle.knowledge3, 10)),
+    ]
+
+    print(f"{'puzzle':>8}" + "".join(f"{name:>14}" for name, _ in CHECKERS)
+          + f"{'kb':>14}{'best':>10}")
+    for label, knowledge in puzzles:
+        answers = []
+        times = []
+        for _, checker in CHECKERS:
+            answer, elapsed = time_checker(checker, knowledge, symbols, repeat)
+            answers.append(answer)
+            times.append(elapsed)
+        answer, elapsed = time_knowledge_base(knowledge, symbols, repeat)
+        answers.append(answer)
+        times.append(elapsed)
+        if any(answer != answers[0] for answer in answers):
+            sys.exit(f"Checkers disagree on puzzle {label}")
+        print(f"{label:>8}" + "".join(f"{1000 * t:>11.3f} ms" for t in times)
+              + f"{times[0] / min(times):>9.1f}x")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "scale":
+        most = int(sys.argv[2]) if len(sys.argv) > 2 else 26
+        benchmark_scale(most)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+        benchmark_build(count)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "parallel":
+        most = int(sys.argv[2]) if len(sys.argv) > 2 else 11
+        worker_counts = [int(arg) for arg in sys.argv[3:]]
+        if not worker_counts:
+            cpus = os.cpu_count() or 1
+            worker_counts = sorted({1, 2, cpus // 2 or 1, cpus})
+        benchmark_parallel(most, worker_counts)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "suite":
+        most = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+        path = sys.argv[3] if len(sys.argv) > 3 else "benchmark.csv"
+        benchmark_suite(most, path)
+        return
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [repeat]\n"
+                 "       python benchmark.py scale [symbols]\n"
+                 "       python benchmark.py build [characters]\n"
+                 "       python benchmark.py parallel [characters] [workers ...]\n"
+                 "       python benchmark.py suite [characters] [csv]")
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    benchmark_puzzles(repeat)
+
+
+if __name__ == "__main__":
+    main()
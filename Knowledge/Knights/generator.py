@@ -0,0 +1,124 @@
+"""
+Random Knights and Knaves puzzles
+
+Each puzzle has some characters, every one a knight who only tells the
+truth or a knave who only lies, and some statements, each made by one
+character about the others. Statements nest claims with and, or, not,
+if and if-and-only-if, and the puzzle is only kept if the statements
+pin down exactly who is a knight and who is a knave.
+"""
+
+import random
+import string
+import sys
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, sat_model_check
+
+
+def name(i):
+    """Returns the name of character i: A to Z, then A1 to Z1 and so on."""
+    letter = string.ascii_uppercase[i % 26]
+    return letter if i < 26 else f"{letter}{i // 26}"
+
+
+def character_symbols(characters):
+    """
+    Returns the symbols that say each character is a knight
+    and each character is a knave.
+    """
+    knights = [Symbol(f"{name(i)} is a Knight") for i in range(characters)]
+    knaves = [Symbol(f"{name(i)} is a Knave") for i in range(characters)]
+    return knights, knaves
+
+
+def random_claim(knights, knaves, depth, rng):
+    """
+    Returns a random claim about the characters,
+    nesting connectives up to depth deep.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        i = rng.randrange(len(knights))
+        return rng.choice([knights, knaves])[i]
+    left = random_claim(knights, knaves, depth - 1, rng)
+    right = random_claim(knights, knaves, depth - 1, rng)
+    connective = rng.choice([And, Or, Implication, Biconditional, Not])
+    if connective is Not:
+        return Not(left)
+    return connective(left, right)
+
+
+def truth(sentence, solution):
+    """
+    Returns whether a sentence holds when the symbols in solution
+    are true and every other symbol is false.
+    """
+    true = {symbol.name for symbol in solution}
+    model = {symbol: symbol in true for symbol in sentence.symbols()}
+    return sentence.evaluate(model)
+
+
+def solved(knowledge, knights):
+    """
+    Checks if a knowledge base says of every character
+    whether they are a knight.
+    """
+    return all(sat_model_check(knowledge, knight)
+               or sat_model_check(knowledge, Not(knight))
+               for knight in knights)
+
+
+def generate(characters, statements, depth=2, rng=random, attempts=1000):
+    """
+    Returns a random puzzle about characters characters as a knowledge
+    base that includes statements statements, nested up to depth deep,
+    and the symbols for each character being a knight and a knave.
+    Every character is a knight or a knave but not both, and the
+    knowledge base has exactly one solution.
+
+    Each statement is made by a random character, about a random claim
+    that is true if and only if that character is a knight in a solution
+    picked first, so the puzzle is always consistent. Raises an exception
+    if no puzzle found within attempts attempts has a single solution.
+    """
+    knights, knaves = character_symbols(characters)
+    rules = []
+    for knight, knave in zip(knights, knaves):
+        rules.append(Or(knight, knave))
+        rules.append(Not(And(knight, knave)))
+
+    for _ in range(attempts):
+        solution = {knight if rng.random() < 0.5 else knave
+                    for knight, knave in zip(knights, knaves)}
+        said = []
+        for _ in range(statements):
+            speaker = rng.randrange(characters)
+            claim = random_claim(knights, knaves, depth, rng)
+            if truth(claim, solution) != (knights[speaker] in solution):
+                claim = Not(claim)
+            said.append(Biconditional(knights[speaker], claim))
+
+        knowledge = And(*rules, *said)
+        if solved(knowledge, knights):
+            return knowledge, knights + knaves
+    raise Exception(f"no puzzle with {characters} characters and "
+                    f"{statements} statements has a single solution")
+
+
+def main():
+    if len(sys.argv) < 3 or len(sys.argv) > 5:
+        sys.exit("Usage: python generator.py characters statements [depth] [seed]")
+    characters, statements = int(sys.argv[1]), int(sys.argv[2])
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    rng = random.Random(sys.argv[4] if len(sys.argv) > 4 else None)
+
+    knowledge, symbols = generate(characters, statements, depth, rng)
+    for sentence in knowledge.conjuncts[2 * characters:]:
+        print(sentence.formula())
+    print()
+    for symbol in symbols:
+        if sat_model_check(knowledge, symbol):
+            print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,70 @@
+import functools
 import itertools
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Maps (class, parts...) of every live sentence to a weak reference to it
+_interned = {}
+
+
+class _Ref(weakref.ref):
+    """A weak reference to a sentence that knows its key in _interned."""
+    __slots__ = ("key",)
+
+
+def _forget(ref):
+    """Drops a sentence from _interned once it has been freed."""
+    if _interned.get(ref.key) is ref:
+        del _interned[ref.key]
 
 
 class Sentence():
+    """
+    Sentences are immutable and hash-consed: building a sentence equal
+    to one that already exists returns that sentence, so equal
+    subformulas are shared, and equality and hashing are by identity,
+    which take constant time. A sentence's symbols are worked out the
+    first time they are asked for and kept.
+    """
+
+    __slots__ = ("_symbols", "__weakref__")
+
+    __hash__ = object.__hash__
+
+    @classmethod
+    def interned(cls, key):
+        """
+        Returns the live sentence built from key, a tuple of its
+        class and parts, or None if there is none.
+        """
+        ref = _interned.get(key)
+        if ref is not None:
+            return ref()
+        return None
+
+    @classmethod
+    def new(cls, key):
+        """
+        Returns a new sentence of class cls, registered under key,
+        whose parts the caller then fills in.
+        """
+        sentence = object.__new__(cls)
+        ref = _interned[key] = _Ref(sentence, _forget)
+        ref.key = key
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("sentences are immutable")
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,9 +74,48 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def parts(self):
+        """Returns the sentences this sentence is made of."""
+        return ()
+
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        try:
+            return self._symbols
+        except AttributeError:
+            pass
+
+        # Visit each shared subformula once
+        names = set()
+        seen = set()
+        stack = [self]
+        while stack:
+            sentence = stack.pop()
+            if isinstance(sentence, Symbol):
+                names.add(sentence.name)
+            elif id(sentence) not in seen:
+                seen.add(id(sentence))
+                stack.extend(sentence.parts())
+        symbols = frozenset(names)
+        object.__setattr__(self, "_symbols", symbols)
+        return symbols
+
+    def expression(self, index):
+        """
+        Returns Python source for the sentence's truth value in a model
+        given as an integer m, where each symbol is true if bit
+        index[symbol] of m is set.
+        """
+        raise Exception("nothing to compile")
+
+    def bitwise(self, index):
+        """
+        Returns Python source for the sentence's truth value in many
+        models at once, where c[index[symbol]] packs the symbol's value
+        in each model into the bits of an integer array, and t and f
+        are arrays of all true and all false bits.
+        """
+        raise Exception("nothing to compile")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +145,19 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        key = (cls, name)
+        symbol = Sentence.interned(key)
+        if symbol is None:
+            symbol = cls.new(key)
+            object.__setattr__(symbol, "name", name)
+            object.__setattr__(symbol, "_symbols", frozenset([name]))
+        return symbol
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -65,20 +171,36 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def expression(self, index):
+        try:
+            return f"(m >> {index[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def bitwise(self, index):
+        try:
+            return f"c[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        key = (cls, operand)
+        sentence = Sentence.interned(key)
+        if sentence is None:
+            sentence = cls.new(key)
+            object.__setattr__(sentence, "operand", operand)
+        return sentence
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    def parts(self):
+        return (self.operand,)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +211,35 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, index):
+        operand, negated = _negations(self)
+        source = operand.expression(index)
+        return f"(not {source})" if negated else source
+
+    def bitwise(self, index):
+        operand, negated = _negations(self)
+        source = operand.bitwise(index)
+        return f"(~{source})" if negated else source
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        key = (cls, conjuncts)
+        sentence = Sentence.interned(key)
+        if sentence is None:
+            sentence = cls.new(key)
+            object.__setattr__(sentence, "conjuncts", conjuncts)
+        return sentence
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+    def parts(self):
+        return self.conjuncts
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def __reduce__(self):
+        return (And, self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,9 +247,14 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def with_conjunct(self, conjunct):
+        """Returns the conjunction of this sentence's conjuncts and conjunct."""
+        return And(*self.conjuncts, conjunct)
+
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        raise AttributeError("sentences are immutable; use "
+                             "knowledge = knowledge.with_conjunct(conjunct) "
+                             "to get a new And, or a KnowledgeBase to add to")
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +265,41 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, index):
+        conjuncts = _flattened(self)
+        if not conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in conjuncts
+        ) + ")"
+
+    def bitwise(self, index):
+        conjuncts = _flattened(self)
+        if not conjuncts:
+            return "t"
+        return "(" + " & ".join(
+            conjunct.bitwise(index) for conjunct in conjuncts
+        ) + ")"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        key = (cls, disjuncts)
+        sentence = Sentence.interned(key)
+        if sentence is None:
+            sentence = cls.new(key)
+            object.__setattr__(sentence, "disjuncts", disjuncts)
+        return sentence
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+    def parts(self):
+        return self.disjuncts
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +314,42 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, index):
+        disjuncts = _flattened(self)
+        if not disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in disjuncts
+        ) + ")"
+
+    def bitwise(self, index):
+        disjuncts = _flattened(self)
+        if not disjuncts:
+            return "f"
+        return "(" + " | ".join(
+            disjunct.bitwise(index) for disjunct in disjuncts
+        ) + ")"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        key = (cls, antecedent, consequent)
+        sentence = Sentence.interned(key)
+        if sentence is None:
+            sentence = cls.new(key)
+            object.__setattr__(sentence, "antecedent", antecedent)
+            object.__setattr__(sentence, "consequent", consequent)
+        return sentence
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+    def parts(self):
+        return (self.antecedent, self.consequent)
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,45 +363,338 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def bitwise(self, index):
+        antecedent = self.antecedent.bitwise(index)
+        consequent = self.consequent.bitwise(index)
+        return f"(~{antecedent} | {consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        key = (cls, left, right)
+        sentence = Sentence.interned(key)
+        if sentence is None:
+            sentence = cls.new(key)
+            object.__setattr__(sentence, "left", left)
+            object.__setattr__(sentence, "right", right)
+        return sentence
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+    def parts(self):
+        return (self.left, self.right)
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+    def bitwise(self, index):
+        left = self.left.bitwise(index)
+        right = self.right.bitwise(index)
+        return f"(~({left} ^ {right}))"
+
+
+def _flattened(sentence):
+    """
+    Returns the parts of an And or Or, with the parts of any And or Or
+    of the same kind inside it in its place, so that knowledge bases
+    built up one conjunct at a time compile to flat expressions.
+    """
+    kind = type(sentence)
+    parts = []
+    stack = [sentence]
+    while stack:
+        current = stack.pop()
+        if type(current) is kind:
+            stack.extend(reversed(current.parts()))
+        else:
+            parts.append(current)
+    return parts
+
+
+def _negations(sentence):
+    """
+    Returns the sentence inside a chain of Nots, and whether
+    there are an odd number of them.
+    """
+    negated = False
+    while isinstance(sentence, Not):
+        sentence = sentence.operand
+        negated = not negated
+    return sentence, negated
+
+
+# Errors Python raises for source nested too deeply to compile
+TOO_DEEP = (SyntaxError, RecursionError, MemoryError)
+
+
+def compile_sentence(sentence, index):
+    """
+    Returns a function that evaluates a sentence in a model given as an
+    integer, where each symbol is true if bit index[symbol] is set.
+
+    Sentences nested too deeply for Python to compile are evaluated
+    by walking the sentence instead, as recursive_model_check does.
+    """
+    try:
+        return compile_source(sentence.expression(index))
+    except TOO_DEEP:
+        bits = list(index.items())
+        return lambda m: sentence.evaluate(
+            {symbol: m >> i & 1 for symbol, i in bits})
+
+
+@functools.lru_cache(maxsize=256)
+def compile_source(source):
+    """Returns a function of a model m that evaluates Python source."""
+    return eval(f"lambda m: {source}")
+
+
+@functools.lru_cache(maxsize=64)
+def compile_bitwise(source):
+    """
+    Returns a function of packed symbol values c and arrays of all true
+    and all false bits t and f that evaluates Python source.
+    """
+    return eval(f"lambda c, t, f: {source}")
+
+
+def model_check(knowledge, query, backend="compiled"):
+    """
+    Checks if knowledge base entails query, using the checker
+    named backend in BACKENDS.
+    """
+    try:
+        checker = BACKENDS[backend]
+    except KeyError:
+        raise Exception(f"unknown backend {backend}; "
+                        f"choose from {', '.join(BACKENDS)}")
+    return checker(knowledge, query)
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query.
+
+    Each model is an integer with one bit per symbol, and knowledge and
+    query are compiled into Python functions of it, so that the models
+    of the knowledge base are filtered out and the query checked in
+    each of them without building any dicts.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    holds = compile_sentence(knowledge, index)
+    entailed = compile_sentence(query, index)
+    return all(map(entailed, filter(holds, range(2 ** len(symbols)))))
+
+
+class KnowledgeBase():
+    """
+    A knowledge base that keeps its models, so that it can answer many
+    queries without enumerating them again. Each model is an integer
+    with one bit per symbol, numbered in the order the symbols were
+    first added, and adding a sentence only narrows the models kept.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.symbols = []
+        self.index = {}
+
+        # With no symbols there is one model, and it is allowed
+        self.models = [0]
+        for sentence in sentences:
+            self.add(sentence)
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def __repr__(self):
+        return f"KnowledgeBase({', '.join(map(str, self.sentences))})"
+
+    def add(self, sentence):
+        """
+        Adds a sentence, keeping only the models in which it is true.
+        Models are first extended with every assignment of any symbols
+        the knowledge base has not seen before.
+        """
+        Sentence.validate(sentence)
+        new = sorted(sentence.symbols() - self.index.keys())
+        base = len(self.symbols)
+        for symbol in new:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        holds = compile_sentence(sentence, self.index)
+        self.models = [model for extra in range(2 ** len(new))
+                       for model in map((extra << base).__or__, self.models)
+                       if holds(model)]
+        self.sentences.append(sentence)
+
+    def knowledge(self):
+        """Returns the conjunction of every sentence added."""
+        return And(*self.sentences)
+
+    def ask(self, query):
+        """
+        Checks if the knowledge base entails query, by checking it in
+        every model kept. Symbols the knowledge base says nothing
+        about may take either value.
+        """
+        Sentence.validate(query)
+        index = dict(self.index)
+        base = len(index)
+        for symbol in sorted(query.symbols() - index.keys()):
+            index[symbol] = len(index)
+
+        entailed = compile_sentence(query, index)
+        return all(all(map(entailed, map((extra << base).__or__, self.models)))
+                   for extra in range(2 ** (len(index) - base)))
+
+
+def vectorized_model_check(knowledge, query, chunk_bits=22):
+    """
+    Checks if knowledge base entails query using NumPy, evaluating
+    2 ** chunk_bits models at a time.
+
+    Models are numbered so that bit i of a model's number is the value
+    of symbol i, and each symbol's values across a chunk of models are
+    packed 64 to a word. The first 6 symbols repeat the same pattern in
+    every word, the next chunk_bits - 6 alternate between whole words
+    of true and false, and the rest are the same throughout a chunk.
+    """
+    if np is None:
+        raise Exception("vectorized_model_check needs numpy")
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    try:
+        counterexamples = compile_bitwise(
+            f"{knowledge.bitwise(index)} & ~{query.bitwise(index)}")
+    except TOO_DEEP:
+        return compiled_model_check(knowledge, query)
+
+    # Too few symbols to fill a word just repeats models
+    width = max(len(symbols), 6)
+    bits = max(6, min(width, chunk_bits))
+    words = 2 ** (bits - 6)
+    t = np.full(words, ~np.uint64(0))
+    f = np.zeros(words, dtype=np.uint64)
+
+    columns = []
+    for i in range(6):
+        pattern = sum(1 << row for row in range(64) if row >> i & 1)
+        columns.append(np.full(words, pattern, dtype=np.uint64))
+    word_numbers = np.arange(words, dtype=np.uint64)
+    for i in range(6, bits):
+        columns.append(np.where((word_numbers >> np.uint64(i - 6)) & np.uint64(1), t, f))
+
+    for chunk in range(2 ** (width - bits)):
+        c = columns + [t if chunk >> (i - bits) & 1 else f
+                       for i in range(bits, width)]
+        if counterexamples(c, t, f).any():
+            return False
+    return True
+
+
+# Set in each worker process of parallel_model_check once a
+# counter-model has been found, so that every chunk stops early
+_found = None
+
+
+def _start_worker(found):
+    global _found
+    _found = found
+
+
+def _check_chunk(knowledge_source, query_source, start, stop, step):
+    """
+    Checks that query holds in every model numbered from start up to
+    stop where knowledge does, step models at a time, giving up once
+    any chunk has found a counter-model.
+    """
+    holds = compile_source(knowledge_source)
+    entailed = compile_source(query_source)
+    for low in range(start, stop, step):
+        if _found.is_set():
+            return True
+        models = range(low, min(low + step, stop))
+        if not all(map(entailed, filter(holds, models))):
+            _found.set()
+            return False
+    return True
+
+
+def parallel_model_check(knowledge, query, workers=None, split=None,
+                         step=2 ** 16):
+    """
+    Checks if knowledge base entails query in a pool of worker
+    processes, splitting the models on the values of the last split
+    symbols into 2 ** split chunks that each worker checks like
+    compiled_model_check. As soon as any chunk finds a model of the
+    knowledge base where query is false, every worker stops.
+
+    By default there are as many workers as CPUs and about four chunks
+    for each. Knowledge bases with at most step models, or with one
+    worker, are checked in this process, as starting workers would
+    take longer than checking every model. So are sentences nested too
+    deeply to compile.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    workers = workers or os.cpu_count() or 1
+    count = 2 ** len(symbols)
+    if workers == 1 or count <= step:
+        return compiled_model_check(knowledge, query)
+
+    # Workers are sent source, so it must be able to compile
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    try:
+        sources = (knowledge.expression(index), query.expression(index))
+        for source in sources:
+            compile_source(source)
+    except TOO_DEEP:
+        return compiled_model_check(knowledge, query)
+
+    if split is None:
+        split = (4 * workers - 1).bit_length()
+    split = min(split, len(symbols))
+    size = count >> split
+
+    found = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=_start_worker,
+                             initargs=(found,)) as pool:
+        pending = {pool.submit(_check_chunk, *sources, start, start + size, step)
+                   for start in range(0, count, size)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if not all(future.result() for future in done):
+                found.set()
+                for future in pending:
+                    future.cancel()
+                return False
+    return True
+
+
+def recursive_model_check(knowledge, query):
+    """Checks if knowledge base entails query, one model dict at a time."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +725,327 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class CNF():
+    """
+    Clauses equisatisfiable with the sentences added to them, built
+    by Tseitin's transformation: each connective inside a sentence gets
+    a new variable that stands for it, defined by a few clauses, so
+    the clauses grow linearly with the sentences.
+
+    Variables are numbered from 1, a literal is a variable or its
+    negation, and a clause is a list of literals.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+
+        # Maps sentences already translated to their literals
+        self.literals = {}
+        self.true = None
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable for a symbol's name."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def constant(self):
+        """Returns a variable that is always true."""
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append([self.true])
+        return self.true
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when sentence is."""
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, And):
+            literal = self.gate([self.literal(conjunct)
+                                 for conjunct in sentence.conjuncts], True)
+        elif isinstance(sentence, Or):
+            literal = self.gate([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts], False)
+        elif isinstance(sentence, Implication):
+            literal = self.gate([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)], False)
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.new_variable()
+            self.clauses.extend([
+                [-literal, -left, right],
+                [-literal, left, -right],
+                [literal, left, right],
+                [literal, -left, -right],
+            ])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def gate(self, literals, conjunction):
+        """
+        Returns a new variable defined as the conjunction,
+        or else the disjunction, of literals.
+        """
+        if not literals:
+            return self.constant() if conjunction else -self.constant()
+        if len(literals) == 1:
+            return literals[0]
+        sign = 1 if conjunction else -1
+        gate = self.new_variable()
+        for literal in literals:
+            self.clauses.append([-sign * gate, sign * literal])
+        self.clauses.append([sign * gate] + [-sign * literal for literal in literals])
+        return gate
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true, splitting
+        conjunctions and disjunctions at the top so that they need no
+        variables of their own.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """
+    A CDCL SAT solver: DPLL search with unit propagation over two
+    watched literals per clause, learning a clause from each conflict
+    at its first unique implication point and jumping back to the
+    level it asserts at. Decisions pick the variable most involved in
+    recent conflicts and try the value it last had.
+    """
+
+    def __init__(self, count, clauses):
+        self.count = count
+        self.value = [0] * (count + 1)
+        self.level = [0] * (count + 1)
+        self.reason = [None] * (count + 1)
+        self.phase = [-1] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.bump = 1.0
+        self.trail = []
+        self.levels = []
+        self.head = 0
+        self.watches = {}
+        self.units = []
+        self.conflicts = 0
+        self.empty = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.empty = True
+        elif len(clause) == 1:
+            self.units.append(clause[0])
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def truth(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.value[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.value[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.levels)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses,
+        returning a clause made false if there is one.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for position, clause in enumerate(watching):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.truth(clause[0]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Watch some other literal that is not false
+                for i in range(2, len(clause)):
+                    if self.truth(clause[i]) != -1:
+                        clause[1], clause[i] = clause[i], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.truth(clause[0]) == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false] = kept
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, its asserting
+        literal first, and the level to jump back to.
+        """
+        current = len(self.levels)
+        learned = [None]
+        seen = set()
+        pending = 0
+        position = len(self.trail) - 1
+        clause, variable = conflict, None
+        while True:
+            for literal in clause:
+                other = abs(literal)
+                if other == variable or other in seen or not self.level[other]:
+                    continue
+                seen.add(other)
+                self.activity[other] += self.bump
+                if self.level[other] == current:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve with the reason of the latest literal in the conflict
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            variable = abs(literal)
+            pending -= 1
+            if not pending:
+                break
+            clause = self.reason[variable]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.level[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def backjump(self, level):
+        """Undoes every assignment made above level."""
+        if len(self.levels) <= level:
+            return
+        start = self.levels[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.value[variable]
+            self.value[variable] = 0
+            self.reason[variable] = None
+        del self.trail[start:]
+        del self.levels[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the most activity, if any."""
+        best, choice = -1.0, None
+        for variable in range(1, self.count + 1):
+            if not self.value[variable] and self.activity[variable] > best:
+                best, choice = self.activity[variable], variable
+        return choice
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list of values indexed by
+        variable, True or False, or None if the clauses are unsatisfiable.
+        """
+        if self.empty:
+            return None
+        for literal in self.units:
+            if self.truth(literal) == -1:
+                return None
+            if not self.truth(literal):
+                self.assign(literal, None)
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.levels:
+                    return None
+                self.conflicts += 1
+                learned, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+
+                # Make later conflicts count for more than earlier ones
+                self.bump *= 1.05
+                if self.bump > 1e100:
+                    self.activity = [a / 1e100 for a in self.activity]
+                    self.bump /= 1e100
+            else:
+                variable = self.decide()
+                if variable is None:
+                    return [value > 0 for value in self.value]
+                self.levels.append(len(self.trail))
+                self.assign(variable * self.phase[variable], None)
+
+
+def sat_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, which it does exactly
+    when knowledge and the negation of query can't both be true.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf.count, cnf.clauses).solve() is None
+
+
+# Maps backend names to checkers model_check can use
+BACKENDS = {
+    "compiled": compiled_model_check,
+    "parallel": parallel_model_check,
+    "recursive": recursive_model_check,
+    "sat": sat_model_check,
+}
+if np is not None:
+    BACKENDS["vectorized"] = vectorized_model_check
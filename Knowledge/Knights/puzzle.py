@@ -85,9 +85,11 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # Enumerate the puzzle's models once for every symbol
+            base = KnowledgeBase(*knowledge.conjuncts)
             for symbol in symbols:
                 #print(symbol)
-                if model_check(knowledge, symbol):
+                if base.ask(symbol):
                     print(f"    {symbol}")
 
 
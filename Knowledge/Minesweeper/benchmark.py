@@ -0,0 +1,73 @@
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, latencies):
+    """
+    Plays a game with the AI, adding the time each call to
+    add_knowledge takes to latencies. Returns whether the AI won and
+    the most sentences its knowledge base held. Raises an exception if
+    the AI ever marks a mine as safe or a safe cell as a mine.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    largest = 0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None:
+            break
+        if game.is_mine(move):
+            return False, largest
+
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+        largest = max(largest, len(ai.knowledge))
+
+        if ai.safes & game.mines or not ai.mines <= game.mines:
+            raise Exception(f"AI inferred wrongly after playing {move}")
+    return len(ai.moves_made) == height * width - mines, largest
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which a fraction of sorted values fall.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    if len(sys.argv) > 5:
+        sys.exit("Usage: python benchmark.py [games] [height] [width] [mines]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    width = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    mines = int(sys.argv[4]) if len(sys.argv) > 4 else 99
+
+    # Seeded so that the same boards are played every time
+    random.seed(50)
+    latencies = []
+    wins = 0
+    largest = 0
+    for _ in range(games):
+        won, size = play(height, width, mines, latencies)
+        wins += won
+        largest = max(largest, size)
+
+    latencies.sort()
+    print(f"{games} games on {height}x{width} with {mines} mines: "
+          f"{wins} won, {len(latencies)} moves, "
+          f"at most {largest} sentences known")
+    print("add_knowledge latency: " + ", ".join(
+        f"{label} {1000 * percentile(latencies, fraction):.3f} ms"
+        for label, fraction in [("p50", 0.5), ("p90", 0.9),
+                                ("p99", 0.99), ("max", 1)]))
+
+
+if __name__ == "__main__":
+    main()
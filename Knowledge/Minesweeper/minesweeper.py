@@ -155,8 +155,16 @@ class MinesweeperAI:
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, keyed by their
+        # cells, none of which are known to be safe or mines
+        self.knowledge = {}
+
+        # Maps each cell to the cells of the sentences it is in
+        self.containing = {}
+
+        # Cells of sentences that are new or changed, whose
+        # consequences are still to be worked out
+        self.pending = []
 
     def mark_mine(self, cell):
         """
@@ -164,8 +172,9 @@ class MinesweeperAI:
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.remove_sentences(cell):
             sentence.mark_mine(cell)
+            self.add_sentence(sentence.cells, sentence.count)
 
     def mark_safe(self, cell):
         """
@@ -173,8 +182,41 @@ class MinesweeperAI:
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.remove_sentences(cell):
             sentence.mark_safe(cell)
+            self.add_sentence(sentence.cells, sentence.count)
+
+    def remove_sentences(self, cell):
+        """
+        Removes and returns every sentence about a cell.
+        """
+        removed = []
+        for cells in self.containing.pop(cell, ()):
+            removed.append(self.knowledge.pop(cells))
+            for other in cells:
+                if other != cell:
+                    self.containing[other].discard(cells)
+        return removed
+
+    def add_sentence(self, cells, count):
+        """
+        Adds a sentence about cells to the knowledge base, leaving out
+        cells already known to be safe or mines, unless the knowledge
+        base already has a sentence about the same cells.
+        """
+        cells = set(cells)
+        for cell in cells & self.mines:
+            cells.remove(cell)
+            count -= 1
+        cells -= self.safes
+
+        key = frozenset(cells)
+        if not key or key in self.knowledge:
+            return
+        self.knowledge[key] = Sentence(key, count)
+        for cell in key:
+            self.containing.setdefault(cell, set()).add(key)
+        self.pending.append(key)
 
     def add_knowledge(self, cell, count):
         """
@@ -202,26 +244,9 @@ class MinesweeperAI:
                     continue
                 if 0 <= i < self.height and 0 <= j < self.width:
                     neighbouringCells.add((i, j))
-        sentence1 = Sentence(neighbouringCells, count)
-        self.knowledge.append(sentence1)
-
-        safeSet = set()
-        mineSet = set()
-
-        for sentence in self.knowledge:
-            for cells in sentence.known_safes():
-                safeSet.add(cells)
-            for cells in sentence.known_mines():
-                mineSet.add(cells)
-        for cell in safeSet:
-            self.mark_safe(cell)
-        for cell in mineSet:
-            self.mark_mine(cell)
+        self.add_sentence(neighbouringCells, count)
 
-        inferred = self.make_inference()
-
-        for sentence in inferred:
-            self.knowledge.append(sentence)
+        self.make_inference()
 
     def make_safe_move(self):
         """
@@ -254,21 +279,37 @@ class MinesweeperAI:
         return None
 
     def make_inference(self):
-        inferred = []
-        toBeRemoved = []
-
-        for sentence in self.knowledge:
-            if not sentence:
-                toBeRemoved.append(sentence)
-
-            for sentence1 in self.knowledge:
-                if sentence != sentence1:
-                    if not sentence1:
-                        toBeRemoved.append(sentence1)
-                    elif sentence.cells <= sentence1.cells:
-                        newCells = sentence1.cells - sentence.cells
-                        newCount = sentence1.count - sentence.count
-                        inferred.append(Sentence(newCells, newCount))
-
-        self.knowledge = [x for x in self.knowledge if x not in toBeRemoved]
-        return inferred
+        """
+        Works out everything that follows from the pending sentences,
+        until nothing more does. A sentence whose cells are all mines
+        or all safe marks them, and a sentence whose cells are a subset
+        of another's, which must share a cell with it, adds a sentence
+        about the cells in the other but not in it. Marking a cell or
+        adding a sentence makes the sentences it changes pending again.
+        """
+        while self.pending:
+            cells = self.pending.pop()
+            sentence = self.knowledge.get(cells)
+            if sentence is None:
+                continue
+
+            # Marking cells changes the sentence, so loop over its key
+            if sentence.known_mines():
+                for cell in cells:
+                    self.mark_mine(cell)
+                continue
+            if sentence.known_safes():
+                for cell in cells:
+                    self.mark_safe(cell)
+                continue
+
+            neighbours = set()
+            for cell in cells:
+                neighbours |= self.containing[cell]
+            neighbours.discard(cells)
+            for other in neighbours:
+                count = self.knowledge[other].count
+                if cells < other:
+                    self.add_sentence(other - cells, count - sentence.count)
+                elif other < cells:
+                    self.add_sentence(cells - other, sentence.count - count)
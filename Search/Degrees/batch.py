@@ -0,0 +1,108 @@
+import json
+import sys
+
+import degrees
+
+
+def read_pairs(f):
+    """
+    Yields (line number, source, target, error) for each query in a file,
+    where error is None unless the line could not be read, in which case
+    it says why and source and target are None.
+
+    Each line is either a JSON object with "source" and "target" keys or
+    two tab-separated fields. Either field may be a person_id or an
+    exact name.
+    """
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                query = json.loads(line)
+            except ValueError as e:
+                yield number, None, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(query, dict) or "source" not in query or "target" not in query:
+                yield number, None, None, 'expected "source" and "target" keys'
+                continue
+            yield number, query["source"], query["target"], None
+        else:
+            fields = line.split("\t")
+            if len(fields) != 2:
+                yield number, None, None, "expected two tab-separated fields"
+                continue
+            yield number, fields[0], fields[1], None
+
+
+def resolve(person):
+    """
+    Returns (person_id, error) for a person_id or an exact name, ignoring
+    case. Names are never guessed at: a name nobody has, or that several
+    people share, gives person_id None and an error saying which.
+    """
+    if person in degrees.people:
+        return person, None
+    person_ids = degrees.person_ids_for_name(person, fuzzy=False)
+    if len(person_ids) == 0:
+        return None, f"person not found: {person}"
+    if len(person_ids) > 1:
+        return None, (f"ambiguous name: {person} could be "
+                      f"{', '.join(person_ids)} (most films first)")
+    return person_ids[0], None
+
+
+def run_batch(queries, out):
+    """
+    Answers (line number, source, target, error) queries, writing one
+    JSON result per line to out. Queries are grouped by source so that
+    one breadth-first search answers every target for that source.
+    Queries that could not be read or answered get an "error" instead.
+    """
+    by_source = {}
+    for number, source, target, error in queries:
+        if error is None and not (isinstance(source, str) and isinstance(target, str)):
+            error = "source and target must be strings"
+        if error is not None:
+            out.write(json.dumps({"line": number, "error": error}) + "\n")
+            continue
+        result = {"line": number, "source": source, "target": target}
+        source_id, source_error = resolve(source)
+        target_id, target_error = resolve(target)
+        if source_error or target_error:
+            result["error"] = "; ".join(filter(None, [source_error, target_error]))
+            out.write(json.dumps(result) + "\n")
+            continue
+        result["source_id"] = source_id
+        result["target_id"] = target_id
+        by_source.setdefault(source_id, []).append((result, target_id))
+
+    for source_id, group in by_source.items():
+        paths = degrees.shortest_paths(source_id, {t for _, t in group})
+        for result, target_id in group:
+            path = paths[target_id]
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = path
+            if path is None:
+                result["components"] = degrees.component_sizes(source_id, target_id)
+            out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python batch.py [directory] [pairs]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    filename = sys.argv[2] if len(sys.argv) > 2 else "-"
+
+    degrees.load_data(directory)
+    if filename == "-":
+        run_batch(read_pairs(sys.stdin), sys.stdout)
+    else:
+        with open(filename, encoding="utf-8") as f:
+            run_batch(read_pairs(f), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
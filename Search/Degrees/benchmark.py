@@ -0,0 +1,238 @@
+import csv
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import degrees
+from graph import load_graph
+from snapshot import load_snapshot
+from server import QueryClient, QueryPool, serve
+from util import (Node, StackFrontier, QueueFrontier,
+                  DequeStackFrontier, DequeQueueFrontier)
+
+
+def count_expansions(search, source, target):
+    """
+    Runs a search, returning its path, the number of people it expanded
+    and the wall time it took.
+    """
+    expanded = 0
+    graph = degrees.graph
+
+    def counting_movies_of(person):
+        nonlocal expanded
+        expanded += 1
+        return type(graph).movies_of(graph, person)
+
+    # Every search expands a person by listing their movies, directly
+    # or through neighbors, so shadow that method on this instance only
+    # while the search runs
+    graph.movies_of = counting_movies_of
+    try:
+        start = time.perf_counter()
+        path = search(source, target)
+        elapsed = time.perf_counter() - start
+    finally:
+        del graph.movies_of
+    return path, expanded, elapsed
+
+
+def benchmark_search(directory, queries, seed=0):
+    """
+    Compares the one-sided and bidirectional searches
+    on random pairs of people.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    searches = [
+        ("bfs", degrees.shortest_path),
+        ("bidirectional", degrees.bidirectional_shortest_path),
+    ]
+    if degrees.landmarks is not None:
+        searches.append(("landmark A*", degrees.landmark_shortest_path))
+    totals = {name: [0, 0.0] for name, _ in searches}
+
+    for _ in range(queries):
+        source, target = rng.sample(person_ids, 2)
+        lengths = set()
+        for name, search in searches:
+            path, expanded, elapsed = count_expansions(search, source, target)
+            lengths.add(None if path is None else len(path))
+            totals[name][0] += expanded
+            totals[name][1] += elapsed
+        if len(lengths) != 1:
+            sys.exit(f"Searches disagree for {source} -> {target}: {lengths}")
+
+    print(f"{queries} queries on {directory}")
+    for name, (expanded, elapsed) in totals.items():
+        print(f"{name:>14}: {expanded / queries:12.1f} expanded/query "
+              f"{1000 * elapsed / queries:10.3f} ms/query")
+
+
+def benchmark_frontiers(nodes, width):
+    """
+    Pushes nodes through each frontier, keeping about width nodes
+    in it and checking membership before every add, as BFS does.
+    """
+    frontiers = [
+        ("StackFrontier", StackFrontier),
+        ("DequeStackFrontier", DequeStackFrontier),
+        ("QueueFrontier", QueueFrontier),
+        ("DequeQueueFrontier", DequeQueueFrontier),
+    ]
+    print(f"{nodes} nodes, frontier width {width}")
+    for name, cls in frontiers:
+        frontier = cls()
+        start = time.perf_counter()
+        for state in range(nodes):
+            if not frontier.contains_state(state):
+                frontier.add(Node(state=state, parent=None, action=None))
+            if state >= width:
+                frontier.remove()
+        while not frontier.empty():
+            frontier.remove()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>20}: {elapsed:8.3f} s "
+              f"{1e9 * elapsed / nodes:10.1f} ns/node")
+
+
+def benchmark_server(directory, queries, most=None, batch=100, seed=0):
+    """
+    Measures query server throughput through its socket protocol
+    as the number of worker processes grows, up to most workers
+    (by default one per CPU).
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(queries)]
+
+    most = most or os.cpu_count()
+    counts = []
+    workers = 1
+    while workers < most:
+        counts.append(workers)
+        workers *= 2
+    counts.append(most)
+    authkey = secrets.token_bytes(16)
+
+    print(f"{queries} queries on {directory}, {batch} per message, "
+          f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in counts:
+            address = os.path.join(tmp, f"degrees-{workers}.sock")
+            with QueryPool(degrees.graph, degrees.name_index, workers) as pool:
+                thread = threading.Thread(target=serve, args=(pool, address, authkey))
+                thread.start()
+                while not os.path.exists(address):
+                    time.sleep(0.01)
+                with QueryClient(address, authkey) as client:
+                    start = time.perf_counter()
+                    for i in range(0, queries, batch):
+                        client.query(pairs[i:i + batch])
+                    elapsed = time.perf_counter() - start
+                    client.shutdown()
+                thread.join()
+            print(f"{workers:>3} workers: {queries / elapsed:10.1f} queries/s")
+
+
+def load_dicts(directory):
+    """
+    Loads the CSV files into per-entity dicts the way degrees.py
+    originally did, as a baseline for memory use.
+    """
+    names, people, movies = {}, {}, {}
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            people[row["id"]] = {
+                "name": row["name"], "birth": row["birth"], "movies": set()
+            }
+            names.setdefault(row["name"].lower(), set()).add(row["id"])
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movies[row["id"]] = {
+                "title": row["title"], "year": row["year"], "stars": set()
+            }
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+    return names, people, movies
+
+
+def benchmark_memory(directory):
+    """
+    Reports load time and peak and steady-state Python heap use
+    for each way of loading a data directory.
+    """
+    # Make sure the snapshot exists so only mapping it is measured
+    load_snapshot(directory)
+
+    loaders = [
+        ("dicts (DictReader)", lambda: load_dicts(directory)),
+        ("graph, all fields", lambda: load_graph(directory)),
+        ("graph, topology only", lambda: load_graph(directory, frozenset())),
+        ("snapshot (mmap)", lambda: load_snapshot(directory)),
+    ]
+    print(f"Loading {directory}")
+    print(f"{'':>22} {'time':>10} {'peak':>12} {'steady':>12}")
+    for name, loader in loaders:
+        start = time.perf_counter()
+        loader()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        loaded = loader()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del loaded
+        print(f"{name:>22} {elapsed:8.3f} s {peak / 2 ** 20:9.1f} MB "
+              f"{current / 2 ** 20:9.1f} MB")
+    print("Snapshot pages are mapped from the file and not counted above.")
+
+
+def main():
+    usage = ("Usage: python benchmark.py search [directory] [queries]\n"
+             "       python benchmark.py frontier [nodes] [width]\n"
+             "       python benchmark.py server [directory] [queries] [workers]\n"
+             "       python benchmark.py memory [directory]")
+    if len(sys.argv) < 2 or len(sys.argv) > 5:
+        sys.exit(usage)
+    args = sys.argv[2:]
+    if sys.argv[1] == "search":
+        directory = args[0] if len(args) > 0 else "large"
+        queries = int(args[1]) if len(args) > 1 else 100
+        benchmark_search(directory, queries)
+    elif sys.argv[1] == "frontier":
+        nodes = int(args[0]) if len(args) > 0 else 2_000_000
+        width = int(args[1]) if len(args) > 1 else 1000
+        benchmark_frontiers(nodes, width)
+    elif sys.argv[1] == "server":
+        directory = args[0] if len(args) > 0 else "large"
+        queries = int(args[1]) if len(args) > 1 else 10000
+        most = int(args[2]) if len(args) > 2 else None
+        benchmark_server(directory, queries, most)
+    elif sys.argv[1] == "memory":
+        directory = args[0] if len(args) > 0 else "large"
+        benchmark_memory(directory)
+    else:
+        sys.exit(usage)
+
+
+if __name__ == "__main__":
+    main()
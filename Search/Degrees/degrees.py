@@ -1,7 +1,19 @@
-import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import load_graph, PeopleView, MoviesView, NamesView
+from landmarks import alt_shortest_path, load_landmarks
+from nameindex import load_names
+from snapshot import load_snapshot
+from util import Node, DequeQueueFrontier
+
+# Compact graph of people and movies that searches run against
+graph = None
+
+# Optional precomputed landmark distances, None unless built for the data
+landmarks = None
+
+# Prefix and fuzzy lookup over people's names
+name_index = None
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -13,43 +25,24 @@ people = {}
 movies = {}
 
 
-def load_data(directory):
+def load_data(directory, fields=None):
     """
-    Load data from CSV files into memory.
+    Load data from CSV files into memory, memory-mapping the
+    compiled snapshot instead when it is up to date.
+
+    If fields is given, the CSV files are always read and only those
+    optional columns ("birth", "title", "year") are kept.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global graph, landmarks, name_index, names, people, movies
+    if fields is None:
+        graph = load_snapshot(directory)
+    else:
+        graph = load_graph(directory, fields)
+    landmarks = load_landmarks(directory)
+    name_index = load_names(directory, graph)
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
 
 
 def main():
@@ -65,11 +58,21 @@ def main():
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
+    print(f"Using {describe(source)}")
     target = person_id_for_name(input("Name: "))
     if target is None:
         sys.exit("Person not found.")
+    print(f"Using {describe(target)}")
+
+    if not graph.connected(graph.person_index[source], graph.person_index[target]):
+        sizes = component_sizes(source, target)
+        print(f"Not connected. (components of {sizes[0]} and {sizes[1]} people)")
+        return
 
-    path = shortest_path(source, target)
+    if landmarks is not None:
+        path = landmark_shortest_path(source, target)
+    else:
+        path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -91,8 +94,14 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if source == target:
+        return []
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return None
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
 
     explored = set()
@@ -103,7 +112,7 @@ def shortest_path(source, target):
             return None
 
         node = frontier.remove()
-        for action, state in neighbors_for_person(node.state):
+        for action, state in graph.neighbors(node.state):
             if not frontier.contains_state(state) and state not in explored:
                 child = Node(state=state, parent=node, action=action)
 
@@ -114,37 +123,231 @@ def shortest_path(source, target):
                         child = child.parent
 
                     link.reverse()
-                    return link
+                    return _path_ids(link)
                 else:
                     frontier.add(child)
 
-        explored.add(node)
+        explored.add(node.state)
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends and always expanding the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return None
+
+    # Each side maps a person to (movie, person) one step closer
+    # to where that side started, and to its distance from there
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand a whole layer of whichever side is smaller
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, depth = forward_frontier, forward, forward_depth
+            other, other_depth = backward, backward_depth
+        else:
+            frontier, parents, depth = backward_frontier, backward, backward_depth
+            other, other_depth = forward, forward_depth
+
+        best = None
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id in graph.movies_of(person_id):
+                for neighbor in graph.stars_of(movie_id):
+                    if neighbor in other:
+                        # Keep looking through this layer for a shorter meeting
+                        length = depth[person_id] + 1 + other_depth[neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, person_id, movie_id, neighbor)
+                    if neighbor not in parents:
+                        parents[neighbor] = (movie_id, person_id)
+                        depth[neighbor] = depth[person_id] + 1
+                        next_frontier.append(neighbor)
+
+        if best is not None:
+            _, person_id, movie_id, neighbor = best
+            if parents is forward:
+                link = _join_paths(forward, backward, person_id, movie_id, neighbor)
+            else:
+                link = _join_paths(forward, backward, neighbor, movie_id, person_id)
+            return _path_ids(link)
+
+        if parents is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def shortest_paths(source, targets):
+    """
+    Returns a dict mapping each of targets to the shortest list of
+    (movie_id, person_id) pairs that connect the source to it, or to None
+    if there is no possible path, using a single breadth-first search.
+    """
+    source = graph.person_index[source]
+    paths = {target: None for target in targets}
+
+    # Only search for targets in the source's component
+    remaining = {}
+    for target in targets:
+        person = graph.person_index[target]
+        if graph.connected(source, person):
+            remaining[person] = target
+    if source in remaining:
+        paths[remaining.pop(source)] = []
+
+    parents = {source: None}
+    frontier = [source]
+    while frontier and remaining:
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_of(person):
+                for neighbor in graph.stars_of(movie):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, person)
+                    next_frontier.append(neighbor)
+                    if neighbor in remaining:
+                        link = []
+                        step = neighbor
+                        while parents[step] is not None:
+                            link.append((parents[step][0], step))
+                            step = parents[step][1]
+                        link.reverse()
+                        paths[remaining.pop(neighbor)] = _path_ids(link)
+        frontier = next_frontier
+
+    return paths
+
+
+def component_sizes(*person_ids):
+    """
+    Returns the number of people in the connected component
+    of each of the given people.
+    """
+    return [graph.component_size(graph.person_index[person_id])
+            for person_id in person_ids]
+
+
+def degree_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    source and target from the landmark index, with upper None if it is
+    unknown, or None if they are not connected.
+    """
+    if landmarks is None:
+        raise Exception("no landmark index loaded")
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return None
+    return landmarks.bounds(source, target)
+
+
+def landmark_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search guided
+    by the landmark index.
+
+    If no possible path, returns None.
+    """
+    if landmarks is None:
+        raise Exception("no landmark index loaded")
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return None
+    link = alt_shortest_path(graph, landmarks, source, target)
+    return None if link is None else _path_ids(link)
+
+
+def _join_paths(forward, backward, left, movie_id, right):
+    """
+    Builds the path through the edge left -> right, where left was
+    reached from the source and right was reached from the target.
+    """
+    link = []
+    person_id = left
+    while forward[person_id] is not None:
+        step_movie, parent = forward[person_id]
+        link.append((step_movie, person_id))
+        person_id = parent
+    link.reverse()
+
+    link.append((movie_id, right))
+    person_id = right
+    while backward[person_id] is not None:
+        step_movie, child = backward[person_id]
+        link.append((step_movie, child))
+        person_id = child
+    return link
+
+
+def _path_ids(link):
+    """
+    Converts a path of (movie, person) indices into IMDB ids.
+    """
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in link]
+
+
+def person_ids_for_name(name, limit=10, fuzzy=True):
+    """
+    Returns up to limit IMDB ids for a person's name, ranked by number
+    of films. Exact matches, ignoring case, come first; if there are
+    none and fuzzy is true, names within a couple of typos are
+    returned, closest first.
+    """
+    people = name_index.exact(name)[:limit]
+    if not people and fuzzy:
+        people = name_index.fuzzy(name, limit=limit)
+    return [graph.person_ids[person] for person in people]
+
+
+def complete_name(prefix, limit=10):
+    """
+    Returns up to limit IMDB ids for people whose names start with
+    prefix, ranked by number of films.
+    """
+    return [graph.person_ids[person]
+            for person in name_index.complete(prefix, limit)]
+
+
+def describe(person_id):
+    """
+    Returns a person's name, birth year and id for display.
+    """
+    person = people[person_id]
+    return f"{person['name']} (born {person['birth'] or 'unknown'}, ID {person_id})"
 
 
 def person_id_for_name(name):
     """
-    Returns the IMDB id for a person's name,
-    resolving ambiguities as needed.
+    Returns the IMDB id for a person's name, taking the person in the
+    most films when several match, or None if nobody is close.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name, limit=1)
     if len(person_ids) == 0:
         return None
-    elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
-    else:
-        return person_ids[0]
+    return person_ids[0]
 
 
 def neighbors_for_person(person_id):
@@ -152,12 +355,8 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    return {(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])}
 
 
 if __name__ == "__main__":
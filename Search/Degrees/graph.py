@@ -0,0 +1,350 @@
+import csv
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+class Graph():
+    """
+    Bipartite graph of people and the movies they starred in.
+
+    People and movies are numbered densely from 0, and each side's
+    adjacency is stored in compressed sparse row form: the movies of
+    person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None, name_index=None,
+                 component_labels=None, component_sizes=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Lookups from ids and lowercased names to indices, built here
+        # unless the caller already has them
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        if name_index is None:
+            name_index = {}
+            for i, name in enumerate(person_names):
+                name_index.setdefault(name.lower(), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_index = name_index
+
+        # Connected component of each person, and the size of each component
+        if component_labels is None or component_sizes is None:
+            component_labels, component_sizes = connected_components(
+                len(person_ids), movie_offsets, movie_people
+            )
+        self.component_labels = component_labels
+        self.component_sizes = component_sizes
+
+    def connected(self, person, other):
+        """
+        Returns whether two people are linked by any chain of movies.
+        """
+        return self.component_labels[person] == self.component_labels[other]
+
+    def component_size(self, person):
+        """
+        Returns the number of people in a person's connected component.
+        """
+        return self.component_sizes[self.component_labels[person]]
+
+    def movies_of(self, person):
+        """
+        Returns the indices of the movies a person starred in.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_of(self, movie):
+        """
+        Returns the indices of the people who starred in a movie.
+        """
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Returns (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        pairs = []
+        for movie in self.movies_of(person):
+            for costar in movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                pairs.append((movie, costar))
+        return pairs
+
+
+def connected_components(num_people, movie_offsets, movie_people):
+    """
+    Labels each person with a dense component number using union-find
+    over the stars of each movie.
+
+    Returns an array of labels and an array of component sizes.
+    """
+    parent = array("i", range(num_people))
+
+    def find(person):
+        root = person
+        while parent[root] != root:
+            root = parent[root]
+        while parent[person] != root:
+            parent[person], person = root, parent[person]
+        return root
+
+    for movie in range(len(movie_offsets) - 1):
+        start, end = movie_offsets[movie], movie_offsets[movie + 1]
+        if end - start < 2:
+            continue
+        root = find(movie_people[start])
+        for k in range(start + 1, end):
+            other = find(movie_people[k])
+            if other != root:
+                parent[other] = root
+
+    labels = array("i", bytes(4 * num_people))
+    sizes = array("i")
+    roots = {}
+    for person in range(num_people):
+        root = find(person)
+        label = roots.get(root)
+        if label is None:
+            label = roots[root] = len(sizes)
+            sizes.append(0)
+        labels[person] = label
+        sizes[label] += 1
+    return labels, sizes
+
+
+def _compress(keys, rows, width):
+    """
+    Builds CSR offsets and indices from sorted keys of the form
+    row * width + column.
+    """
+    offsets = array("i", bytes(4 * (rows + 1)))
+    indices = array("i", bytes(4 * len(keys)))
+    for k, key in enumerate(keys):
+        row, column = divmod(key, width)
+        offsets[row + 1] += 1
+        indices[k] = column
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+    return offsets, indices
+
+
+# Optional per-entity columns; people's names are always loaded
+FIELDS = frozenset({"birth", "title", "year"})
+
+
+class BlankColumn(Sequence):
+    """
+    Stand-in for a column that was not loaded, reading as empty strings.
+    """
+
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [""] * len(range(*i.indices(self.length)))
+        if not -self.length <= i < self.length:
+            raise IndexError("column index out of range")
+        return ""
+
+    def __len__(self):
+        return self.length
+
+
+def _read_columns(path, wanted):
+    """
+    Streams a CSV file, returning a list per wanted column.
+
+    Values of columns listed in wanted as interned are interned,
+    so repeated values such as years share one string.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(name) for name, _ in wanted]
+        columns = [[] for _ in wanted]
+        appends = [column.append for column in columns]
+        interned = [intern for _, intern in wanted]
+        for row in reader:
+            for append, position, intern in zip(appends, positions, interned):
+                value = row[position]
+                append(sys.intern(value) if intern else value)
+    return columns
+
+
+def load_graph(directory, fields=FIELDS):
+    """
+    Load data from CSV files into a Graph, keeping only the optional
+    columns named in fields and leaving the others blank.
+    """
+    # Names are nearly all distinct, so interning them would cost an
+    # intern table entry each and share almost nothing
+    wanted = [("id", False), ("name", False)]
+    if "birth" in fields:
+        wanted.append(("birth", True))
+    columns = _read_columns(f"{directory}/people.csv", wanted)
+    person_ids, person_names = columns[0], columns[1]
+    person_births = columns[2] if "birth" in fields else BlankColumn(len(person_ids))
+
+    wanted = [("id", False)]
+    if "title" in fields:
+        wanted.append(("title", False))
+    if "year" in fields:
+        wanted.append(("year", True))
+    columns = _read_columns(f"{directory}/movies.csv", wanted)
+    movie_ids = columns.pop(0)
+    movie_titles = columns.pop(0) if "title" in fields else BlankColumn(len(movie_ids))
+    movie_years = columns.pop(0) if "year" in fields else BlankColumn(len(movie_ids))
+
+    return build_graph(person_ids, person_names, person_births,
+                       movie_ids, movie_titles, movie_years,
+                       _read_stars(directory))
+
+
+def _read_stars(directory):
+    """
+    Yields (person_id, movie_id) pairs from stars.csv.
+    """
+    with open(f"{directory}/stars.csv", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        person, movie = header.index("person_id"), header.index("movie_id")
+        for row in reader:
+            yield row[person], row[movie]
+
+
+def build_graph(person_ids, person_names, person_births,
+                movie_ids, movie_titles, movie_years, stars):
+    """
+    Builds a Graph from per-entity columns and (person_id, movie_id)
+    pairs, ignoring pairs that refer to unknown people or movies.
+    """
+    person_index = {pid: i for i, pid in enumerate(person_ids)}
+    movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+    num_people = len(person_ids)
+    num_movies = len(movie_ids)
+
+    # Encode each starring as one int so duplicates collapse and
+    # sorting groups them by person, then by movie
+    by_person = set()
+    for person_id, movie_id in stars:
+        try:
+            by_person.add(
+                person_index[person_id] * num_movies + movie_index[movie_id]
+            )
+        except KeyError:
+            pass
+    by_person = sorted(by_person)
+    by_movie = sorted(
+        (key % num_movies) * num_people + key // num_movies
+        for key in by_person
+    )
+
+    person_offsets, person_movies = _compress(by_person, num_people, num_movies)
+    movie_offsets, movie_people = _compress(by_movie, num_movies, num_people)
+
+    return Graph(person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=person_index, movie_index=movie_index)
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view mapping person_ids to a dictionary of:
+    name, birth, movies (a set of movie_ids).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view mapping movie_ids to a dictionary of:
+    title, year, stars (a set of person_ids).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only view mapping lowercased names to a set of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        person_ids = self.graph.person_ids
+        return {person_ids[p] for p in self.graph.name_index[name]}
+
+    def __contains__(self, name):
+        return name in self.graph.name_index
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return len(self.graph.name_index)
@@ -0,0 +1,223 @@
+import heapq
+import os
+import sys
+import time
+from array import array
+
+from snapshot import is_current, load_snapshot, read_sections, write_sections
+
+LANDMARKS_NAME = "degrees.landmarks"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+def landmarks_path(directory):
+    """
+    Returns where the landmark index for a data directory is kept.
+    """
+    return os.path.join(directory, LANDMARKS_NAME)
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of breadth-first distances, in people, from source
+    to everyone in the graph.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_of(person):
+                for costar in graph.stars_of(movie):
+                    if distances[costar] == UNREACHABLE:
+                        distances[costar] = depth
+                        next_frontier.append(costar)
+        frontier = next_frontier
+    return distances
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few well-connected people, used to
+    bound the distance between any two people without searching.
+
+    By the triangle inequality, for every landmark l,
+    |d(l, s) - d(l, t)| <= d(s, t) <= d(l, s) + d(l, t).
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+
+    def connected(self, source, target):
+        """
+        Returns False if some landmark reaches exactly one of source and
+        target, which proves they are in different components.
+        Returns True otherwise, which only means they might be connected.
+        """
+        for distances in self.distances:
+            if (distances[source] == UNREACHABLE) != (distances[target] == UNREACHABLE):
+                return False
+        return True
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between source and target, with upper None if no landmark
+        reaches both. Returns None if they are known to be unconnected.
+        """
+        if source == target:
+            return 0, 0
+        lower, upper = 1, None
+        for distances in self.distances:
+            ds, dt = distances[source], distances[target]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                return None
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function giving an admissible estimate
+        of each person's distance to target.
+        """
+        reaching = [(distances, distances[target]) for distances in self.distances
+                    if distances[target] != UNREACHABLE]
+
+        def estimate(person):
+            best = 0
+            for distances, dt in reaching:
+                d = distances[person]
+                if d != UNREACHABLE and abs(d - dt) > best:
+                    best = abs(d - dt)
+            return best
+        return estimate
+
+
+def choose_landmarks(graph, k):
+    """
+    Chooses k landmarks: the person in the most movies first, then
+    repeatedly whoever in that person's component is farthest from every
+    landmark so far, breaking ties by movie count.
+
+    Returns the landmarks and their distance arrays.
+    """
+    num_people = len(graph.person_ids)
+    if num_people == 0:
+        return [], []
+    offsets = graph.person_offsets
+    degree = [offsets[p + 1] - offsets[p] for p in range(num_people)]
+
+    landmarks = [max(range(num_people), key=degree.__getitem__)]
+    distances = [distances_from(graph, landmarks[0])]
+    candidates = [p for p, d in enumerate(distances[0]) if d != UNREACHABLE]
+    nearest = {p: distances[0][p] for p in candidates}
+    while len(landmarks) < min(k, len(candidates)):
+        landmark = max(candidates, key=lambda p: (nearest[p], degree[p]))
+        if nearest[landmark] == 0:
+            break
+        landmarks.append(landmark)
+        distances.append(distances_from(graph, landmark))
+        for p in candidates:
+            nearest[p] = min(nearest[p], distances[-1][p])
+    return landmarks, distances
+
+
+def build_landmarks(graph, k=16):
+    """
+    Returns a LandmarkIndex over k landmarks.
+    """
+    return LandmarkIndex(*choose_landmarks(graph, k))
+
+
+def save_landmarks(index, directory):
+    """
+    Writes a landmark index for the data in directory.
+    """
+    sections = {"landmarks": array("i", index.landmarks)}
+    for i, distances in enumerate(index.distances):
+        sections[f"distances.{i}"] = distances
+    write_sections(landmarks_path(directory), directory, sections)
+
+
+def load_landmarks(directory):
+    """
+    Returns the saved landmark index for a data directory,
+    or None if there is none or it is out of date.
+    """
+    path = landmarks_path(directory)
+    saved = read_sections(path)
+    if saved is None:
+        return None
+    header, sections = saved
+    if not is_current(path, directory, header):
+        return None
+    landmarks = sections["landmarks"]
+    return LandmarkIndex(
+        list(landmarks),
+        [sections[f"distances.{i}"] for i in range(len(landmarks))]
+    )
+
+
+def alt_shortest_path(graph, index, source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs from source
+    to target using A* search guided by landmark lower bounds,
+    or None if there is no possible path.
+    """
+    if not index.connected(source, target):
+        return None
+    estimate = index.heuristic(target)
+
+    # Ties on estimated length go to the deepest entry, which
+    # is closest to the target as far as the heuristic can tell
+    parents = {source: None}
+    cost = {source: 0}
+    heap = [(estimate(source), 0, source)]
+    while heap:
+        _, g, person = heapq.heappop(heap)
+        g = -g
+        if g > cost[person]:
+            continue
+        if person == target:
+            link = []
+            while parents[person] is not None:
+                movie, parent = parents[person]
+                link.append((movie, person))
+                person = parent
+            link.reverse()
+            return link
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor not in cost or g + 1 < cost[neighbor]:
+                cost[neighbor] = g + 1
+                parents[neighbor] = (movie, person)
+                heapq.heappush(heap, (g + 1 + estimate(neighbor), -g - 1, neighbor))
+    return None
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [landmarks]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    graph = load_snapshot(directory)
+
+    start = time.perf_counter()
+    index = build_landmarks(graph, k)
+    save_landmarks(index, directory)
+    print(f"Built {len(index.landmarks)} landmarks for {directory} "
+          f"in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
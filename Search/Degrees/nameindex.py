@@ -0,0 +1,311 @@
+import heapq
+import os
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+from snapshot import (SortedIndex, is_current, load_snapshot, read_sections,
+                      write_sections)
+
+NAMES_NAME = "degrees.names"
+
+# Most edits a fuzzy lookup allows, how many characters at each end
+# of a name its deletion indexes cover, and how few candidates one end
+# has to give before the other end is not consulted
+MAX_DISTANCE = 2
+PREFIX = 7
+FEW = 32
+
+# Recorded in saved name indexes, so ones built differently are rebuilt
+NAMES_FORMAT = f"deletes-{MAX_DISTANCE}-{PREFIX}-both-ends"
+
+
+def names_path(directory):
+    """
+    Returns where the name index for a data directory is kept.
+    """
+    return os.path.join(directory, NAMES_NAME)
+
+
+def deletions(word, k):
+    """
+    Returns every string made by deleting at most k characters
+    from word, word included.
+    """
+    variants = {word}
+    frontier = {word}
+    for _ in range(k):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def deletion_key(variant):
+    """
+    Returns the 32-bit key a deletion variant is indexed under.
+    Different variants may share a key; that only adds candidates,
+    which are checked anyway.
+    """
+    return zlib.crc32(variant.encode())
+
+
+def deletion_ranges(keys, piece, k):
+    """
+    Returns the (lo, hi) ranges of a sorted key array holding the keys
+    of piece's deletions of at most k characters.
+    """
+    ranges = []
+    for variant in deletions(piece, k):
+        key = deletion_key(variant)
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key, lo)
+        if lo < hi:
+            ranges.append((lo, hi))
+    return ranges
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between a and b,
+    or limit + 1 if it is more than limit.
+
+    Only cells within limit of the diagonal can stay within limit,
+    so each row fills just that band.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    # Characters both strings start or end with never need an edit
+    shorter = min(len(a), len(b))
+    start = 0
+    while start < shorter and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shorter - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class NameIndex():
+    """
+    Index over people's lowercased names supporting prefix completion,
+    by binary search over the names in sorted order, and bounded
+    edit-distance lookup, by symmetric deletion indexes.
+
+    If two names are within k edits, then deleting at most k characters
+    from each of their first PREFIX characters gives a common string,
+    and so does deleting them from each of their last PREFIX characters.
+    So every name is indexed under the keys of all such deletions of its
+    start in one sorted array, and of its (reversed) end in another.
+    A lookup makes the same deletions of the query's two ends, finds the
+    people under each key by binary search, keeps those found at both
+    ends and checks just them.
+    """
+
+    def __init__(self, graph, order, start_keys, start_people,
+                 end_keys, end_people):
+        self.graph = graph
+        self.sorted_names = SortedIndex(graph.person_names, order,
+                                        unique=False, fold=True).keys
+        self.order = order
+        self.start_keys = start_keys
+        self.start_people = start_people
+        self.end_keys = end_keys
+        self.end_people = end_people
+
+    def films(self, person):
+        """
+        Returns the number of movies a person starred in.
+        """
+        offsets = self.graph.person_offsets
+        return offsets[person + 1] - offsets[person]
+
+    def _ranked(self, people, limit):
+        """
+        Returns up to limit people, most films first.
+        """
+        return heapq.nsmallest(limit, people, key=lambda p: (-self.films(p), p))
+
+    def exact(self, name):
+        """
+        Returns everyone with exactly this name, ignoring case,
+        most films first.
+        """
+        name = name.lower()
+        lo = bisect_left(self.sorted_names, name)
+        hi = bisect_left(self.sorted_names, name + "\0", lo)
+        return self._ranked(self.order[lo:hi], hi - lo)
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to limit people whose names start with prefix,
+        ignoring case, most films first.
+        """
+        prefix = prefix.lower()
+        lo = bisect_left(self.sorted_names, prefix)
+        hi = bisect_left(self.sorted_names, prefix + "\U0010ffff", lo)
+        return self._ranked(self.order[lo:hi], limit)
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit people whose names are within max_distance
+        edits of name, ignoring case, closest first and then most films
+        first. At most MAX_DISTANCE edits are allowed.
+        """
+        name = name.lower()
+        k = min(max_distance, MAX_DISTANCE)
+        if k < 0:
+            return []
+
+        # Gather the people from whichever end matches fewer of them,
+        # then keep only those the other end matches too
+        ends = sorted([
+            (self.start_people, deletion_ranges(self.start_keys, name[:PREFIX], k)),
+            (self.end_people, deletion_ranges(self.end_keys, name[::-1][:PREFIX], k))
+        ], key=lambda end: sum(hi - lo for lo, hi in end[1]))
+        (people, ranges), (other_people, other_ranges) = ends
+        candidates = set()
+        for lo, hi in ranges:
+            candidates.update(people[lo:hi])
+        if len(candidates) > FEW:
+            found = set()
+            for lo, hi in other_ranges:
+                found.update(candidates.intersection(other_people[lo:hi]))
+            candidates = found
+
+        distances = {}
+        matches = []
+        names = self.graph.person_names
+        for person in candidates:
+            candidate = names[person].lower()
+            if candidate not in distances:
+                distances[candidate] = edit_distance(name, candidate, k)
+            if distances[candidate] <= k:
+                matches.append((distances[candidate], -self.films(person), person))
+        return [person for _, _, person in heapq.nsmallest(limit, matches)]
+
+
+def deletion_sections(pieces):
+    """
+    Returns sorted keys of every deletion of at most MAX_DISTANCE
+    characters from each person's piece, and the person under each key.
+    """
+    # Sort key and person together, packed into one integer
+    entries = []
+    for person, piece in enumerate(pieces):
+        for variant in deletions(piece, MAX_DISTANCE):
+            entries.append(deletion_key(variant) << 32 | person)
+    entries.sort()
+    keys = array("I", [entry >> 32 for entry in entries])
+    people = array("i", [entry & 0xFFFFFFFF for entry in entries])
+    return keys, people
+
+
+def build_sections(graph):
+    """
+    Returns the sections of a name index for a graph.
+    """
+    names = [name.lower() for name in graph.person_names]
+    order = array("i", sorted(range(len(names)), key=names.__getitem__))
+    start_keys, start_people = deletion_sections(name[:PREFIX] for name in names)
+    end_keys, end_people = deletion_sections(name[::-1][:PREFIX] for name in names)
+    return {
+        "order": order,
+        "start_keys": start_keys,
+        "start_people": start_people,
+        "end_keys": end_keys,
+        "end_people": end_people
+    }
+
+
+def index_sections(index):
+    """
+    Returns the sections a NameIndex was built from.
+    """
+    return {
+        "order": index.order,
+        "start_keys": index.start_keys,
+        "start_people": index.start_people,
+        "end_keys": index.end_keys,
+        "end_people": index.end_people
+    }
+
+
+def index_from_sections(graph, sections):
+    """
+    Returns a NameIndex over sections built by build_sections.
+    """
+    return NameIndex(graph, sections["order"],
+                     sections["start_keys"], sections["start_people"],
+                     sections["end_keys"], sections["end_people"])
+
+
+def load_names(directory, graph):
+    """
+    Returns the name index for a data directory, memory-mapped from its
+    saved copy when that is current and rebuilt (and saved) otherwise.
+    """
+    path = names_path(directory)
+    saved = read_sections(path)
+    if saved is not None:
+        header, sections = saved
+        if header.get("format") == NAMES_FORMAT and is_current(path, directory, header):
+            return index_from_sections(graph, sections)
+
+    sections = build_sections(graph)
+    try:
+        write_sections(path, directory, sections, format=NAMES_FORMAT)
+    except OSError:
+        pass
+    return index_from_sections(graph, sections)
+
+
+def main():
+    if len(sys.argv) < 2 or len(sys.argv) > 3:
+        sys.exit("Usage: python nameindex.py name [directory]")
+    query = sys.argv[1]
+    directory = sys.argv[2] if len(sys.argv) > 2 else "large"
+
+    graph = load_snapshot(directory)
+    index = load_names(directory, graph)
+
+    for label, lookup in [("exact", index.exact),
+                          ("prefix", index.complete),
+                          ("fuzzy", index.fuzzy)]:
+        start = time.perf_counter()
+        people = lookup(query)
+        elapsed = 1000 * (time.perf_counter() - start)
+        print(f"{label} ({elapsed:.3f} ms):")
+        for person in people:
+            print(f"    {graph.person_ids[person]} {graph.person_names[person]} "
+                  f"({index.films(person)} films)")
+
+
+if __name__ == "__main__":
+    main()
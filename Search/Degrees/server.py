@@ -0,0 +1,288 @@
+import multiprocessing
+import os
+import secrets
+import socket
+import stat
+import sys
+import threading
+from multiprocessing import shared_memory
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import degrees
+from batch import resolve
+from graph import PeopleView, MoviesView, NamesView
+from nameindex import index_from_sections, index_sections
+from snapshot import (graph_from_sections, layout_sections, place_sections,
+                      section_views)
+
+# Shared memory block a worker process has attached to
+_memory = None
+
+
+def authkey_path(address):
+    """
+    Returns where a server listening on address keeps its authkey.
+    """
+    return f"{address}.key"
+
+
+def read_authkey(address):
+    """
+    Returns the authkey for a server: DEGREES_AUTHKEY if it is set,
+    otherwise the key the server saved next to its address, or None.
+    """
+    authkey = os.environ.get("DEGREES_AUTHKEY")
+    if authkey is not None:
+        return authkey.encode()
+    try:
+        with open(authkey_path(address), "rb") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def save_authkey(address, authkey):
+    """
+    Saves an authkey next to address, readable only by its owner.
+    """
+    fd = os.open(authkey_path(address), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+
+
+def _remove_stale_socket(address):
+    """
+    Removes a Unix socket left behind at address by a server that
+    crashed, refusing to touch one that a server is still listening on.
+    """
+    if not isinstance(address, str):
+        return
+    try:
+        mode = os.lstat(address).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise Exception(f"{address} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        os.unlink(address)
+        return
+    finally:
+        probe.close()
+    raise Exception(f"a server is already listening on {address}")
+
+
+def _attach(name, header):
+    """
+    Points a worker's degrees module at the graph in shared memory.
+    """
+    global _memory
+    _memory = shared_memory.SharedMemory(name=name)
+    sections = section_views(header, _memory.buf)
+    graph = graph_from_sections(sections)
+    degrees.graph = graph
+    degrees.name_index = index_from_sections(graph, {
+        name[len("names."):]: section for name, section in sections.items()
+        if name.startswith("names.")
+    })
+    degrees.names = NamesView(graph)
+    degrees.people = PeopleView(graph)
+    degrees.movies = MoviesView(graph)
+
+
+def answer(query):
+    """
+    Answers one (source, target) query, where each is a person_id
+    or an exact name.
+    """
+    if not isinstance(query, (tuple, list)) or len(query) != 2:
+        return {"source": None, "target": None,
+                "error": "expected a (source, target) pair"}
+    source, target = query
+    result = {"source": source, "target": target}
+    if not (isinstance(source, str) and isinstance(target, str)):
+        result["error"] = "source and target must be strings"
+        return result
+    source_id, source_error = resolve(source)
+    target_id, target_error = resolve(target)
+    if source_error or target_error:
+        result["error"] = "; ".join(filter(None, [source_error, target_error]))
+        return result
+    result["source_id"] = source_id
+    result["target_id"] = target_id
+    path = degrees.bidirectional_shortest_path(source_id, target_id)
+    result["degrees"] = None if path is None else len(path)
+    result["path"] = path
+    if path is None:
+        result["components"] = degrees.component_sizes(source_id, target_id)
+    return result
+
+
+class QueryPool():
+    """
+    Pool of worker processes answering shortest path queries against
+    one copy of a graph and its name index placed in shared memory.
+    """
+
+    def __init__(self, graph, name_index, workers=None):
+        _, sections, _ = layout_sections(graph)
+        for name, section in index_sections(name_index).items():
+            sections[f"names.{name}"] = section
+        header, size = place_sections(sections)
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        for name, section in sections.items():
+            start, length, _ = header["sections"][name]
+            self.memory.buf[start:start + length] = memoryview(section).cast("B")
+        self.workers = workers or os.cpu_count()
+        self.pool = multiprocessing.Pool(
+            self.workers, initializer=_attach,
+            initargs=(self.memory.name, header)
+        )
+
+    def query(self, pairs, chunksize=8):
+        """
+        Returns the answers to a list of (source, target) pairs, in order.
+        """
+        return self.pool.map(answer, pairs, chunksize)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve(pool, address, authkey=None):
+    """
+    Answers queries from clients connecting to address until one of them
+    asks the server to shut down.
+
+    Each message is a (command, argument) tuple: ("query", pairs) is
+    answered with the list of results, and ("shutdown", None) with None.
+    Anything else, or a query that fails, is answered with a dict
+    whose "error" says why.
+    Messages are pickled, so an authkey is required to keep anyone
+    else who can reach the socket from running code in the server.
+    """
+    if not authkey:
+        raise ValueError("serve needs an authkey")
+    _remove_stale_socket(address)
+    listener = Listener(address, authkey=authkey)
+    stopping = threading.Event()
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    return
+                if not isinstance(message, tuple) or len(message) != 2:
+                    conn.send({"error": "expected a (command, argument) pair"})
+                    continue
+                command, argument = message
+                if command == "query":
+                    # A bad batch gets an error, not a dropped connection
+                    try:
+                        conn.send(pool.query(list(argument)))
+                    except Exception as e:
+                        conn.send({"error": f"query failed: {e!r}"})
+                elif command == "shutdown":
+                    conn.send(None)
+                    stopping.set()
+                    # Wake the accept loop so it sees the request
+                    Client(address, authkey=authkey).close()
+                    return
+                else:
+                    conn.send({"error": f"unknown command {command!r}"})
+
+    with listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                # A client without the key, or one that hung up mid-handshake
+                continue
+            if stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+class QueryClient():
+    """
+    Connection to a running query server, authenticated with authkey
+    or, if that is not given, the key read_authkey finds.
+    """
+
+    def __init__(self, address, authkey=None):
+        if authkey is None:
+            authkey = read_authkey(address)
+        if authkey is None:
+            raise ValueError(f"no authkey for {address}; set DEGREES_AUTHKEY")
+        self.conn = Client(address, authkey=authkey)
+
+    def query(self, pairs):
+        """
+        Returns the server's answers to a list of (source, target) pairs.
+        """
+        self.conn.send(("query", list(pairs)))
+        return self.conn.recv()
+
+    def shutdown(self):
+        self.conn.send(("shutdown", None))
+        self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python server.py [directory] [address] [workers]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    address = sys.argv[2] if len(sys.argv) > 2 else "degrees.sock"
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    try:
+        _remove_stale_socket(address)
+    except Exception as e:
+        sys.exit(str(e))
+    authkey = os.environ.get("DEGREES_AUTHKEY")
+    if authkey is not None:
+        authkey = authkey.encode()
+    else:
+        # Clients on this machine read the key from a file only we can read
+        authkey = secrets.token_hex(16).encode()
+        save_authkey(address, authkey)
+        print(f"Saved a new authkey to {authkey_path(address)}.")
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    try:
+        with QueryPool(degrees.graph, degrees.name_index, workers) as pool:
+            print(f"Serving on {address} with {pool.workers} workers.")
+            serve(pool, address, authkey)
+    finally:
+        if os.environ.get("DEGREES_AUTHKEY") is None:
+            os.remove(authkey_path(address))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+from graph import Graph, load_graph
+
+# Bump whenever the layout below changes so old snapshots get rebuilt
+SNAPSHOT_VERSION = 2
+SNAPSHOT_NAME = "degrees.snapshot"
+MAGIC = b"DEGSNAP\0"
+
+# The JSON header is padded to this size and the sections follow it,
+# so the header can be rewritten in place
+HEADER_SIZE = 4096
+
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_people",
+          "component_labels", "component_sizes"]
+STRINGS = ["person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years"]
+
+
+class StringTable(Sequence):
+    """
+    Sequence of strings stored as one UTF-8 blob plus offsets,
+    decoding each string only when it is read.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class _SortedKeys(Sequence):
+    """
+    Keys of a table in the order given by a permutation,
+    so they can be searched with bisect.
+    """
+
+    def __init__(self, table, order, fold):
+        self.table = table
+        self.order = order
+        self.fold = fold
+
+    def __getitem__(self, i):
+        key = self.table[self.order[i]]
+        return key.lower() if self.fold else key
+
+    def __len__(self):
+        return len(self.order)
+
+
+class SortedIndex(Mapping):
+    """
+    Read-only mapping from the strings in a table to their positions,
+    answered by binary search over a precomputed sort order.
+
+    Unique indexes map each key to one position; others map each key
+    to a list of positions. With fold, keys are compared lowercased.
+    """
+
+    def __init__(self, table, order, unique=True, fold=False):
+        self.keys = _SortedKeys(table, order, fold)
+        self.order = order
+        self.unique = unique
+        self.length = None
+
+    def __getitem__(self, key):
+        lo = bisect_left(self.keys, key)
+        hi = bisect_right(self.keys, key, lo)
+        if lo == hi:
+            raise KeyError(key)
+        if self.unique:
+            return self.order[lo]
+        return list(self.order[lo:hi])
+
+    def __iter__(self):
+        previous = None
+        for i in range(len(self.keys)):
+            key = self.keys[i]
+            if i == 0 or key != previous:
+                yield key
+            previous = key
+
+    def __len__(self):
+        if self.length is None:
+            self.length = sum(1 for _ in self)
+        return self.length
+
+
+def snapshot_path(directory):
+    """
+    Returns where the snapshot for a data directory is kept.
+    """
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def _hash_file(path):
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(directory):
+    """
+    Returns the size, mtime and hash of each source CSV.
+    """
+    sources = {}
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        sources[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _hash_file(path)
+        }
+    return sources
+
+
+def _check_sources(directory, sources):
+    """
+    Compares the source CSVs against a stored fingerprint.
+
+    Returns "fresh" if they are untouched, "touched" if only their mtimes
+    moved but their contents hash the same, and "stale" otherwise.
+    """
+    status = "fresh"
+    for name in SOURCES:
+        if name not in sources:
+            return "stale"
+        stored = sources[name]
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        if stat.st_size != stored["size"]:
+            return "stale"
+        if stat.st_mtime_ns != stored["mtime_ns"]:
+            if _hash_file(path) != stored["sha256"]:
+                return "stale"
+            status = "touched"
+    return status
+
+
+def _encode_header(header):
+    """
+    Returns the magic, length and JSON header padded to HEADER_SIZE.
+    """
+    body = json.dumps(header).encode()
+    prefix = MAGIC + len(body).to_bytes(4, "little")
+    if len(prefix) + len(body) > HEADER_SIZE:
+        raise ValueError("snapshot header too large")
+    return (prefix + body).ljust(HEADER_SIZE, b"\0")
+
+
+def string_sections(strings):
+    """
+    Encodes a list of strings as int64 offsets and a UTF-8 blob.
+    """
+    offsets = array("q", [0])
+    chunks = []
+    total = 0
+    for s in strings:
+        encoded = s.encode()
+        chunks.append(encoded)
+        total += len(encoded)
+        offsets.append(total)
+    return offsets, b"".join(chunks)
+
+
+def place_sections(sections):
+    """
+    Returns a header recording where each of sections goes after the
+    header, and the total size they need.
+    """
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "sections": {}
+    }
+    offset = HEADER_SIZE
+    for name, section in sections.items():
+        view = memoryview(section)
+        header["sections"][name] = [offset, view.nbytes, view.format]
+        offset += (view.nbytes + 7) // 8 * 8
+    return header, offset
+
+
+def layout_sections(graph):
+    """
+    Returns a header describing where each section of a graph goes,
+    the sections themselves, and the total size they need.
+    """
+    sections = {}
+    for name in ARRAYS:
+        sections[name] = getattr(graph, name)
+    for name in STRINGS:
+        offsets, data = string_sections(getattr(graph, name))
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.data"] = data
+
+    # Sort orders used to look up ids and names without building dicts
+    sections["person_order"] = array("i", sorted(
+        range(len(graph.person_ids)), key=graph.person_ids.__getitem__
+    ))
+    sections["movie_order"] = array("i", sorted(
+        range(len(graph.movie_ids)), key=graph.movie_ids.__getitem__
+    ))
+    sections["name_order"] = array("i", sorted(
+        range(len(graph.person_names)),
+        key=lambda i: graph.person_names[i].lower()
+    ))
+
+    header, size = place_sections(sections)
+    return header, sections, size
+
+
+def write_sections(path, directory, sections, **extra):
+    """
+    Writes sections to a file stamped with the fingerprint of the
+    CSV files in directory, plus any extra header fields.
+    """
+    header, _ = place_sections(sections)
+    header.update(extra)
+    header["sources"] = _fingerprint(directory)
+
+    # Write to a temporary file first so readers never see half a file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(_encode_header(header))
+        for name, section in sections.items():
+            start, _, _ = header["sections"][name]
+            f.seek(start)
+            f.write(section)
+    os.replace(temporary, path)
+
+
+def write_snapshot(graph, directory):
+    """
+    Writes a binary snapshot of a graph loaded from directory.
+    """
+    _, sections, _ = layout_sections(graph)
+    write_sections(snapshot_path(directory), directory, sections)
+
+
+def section_views(header, buffer):
+    """
+    Returns typed views of each section described by header in a buffer.
+    """
+    view = memoryview(buffer)
+    return {
+        name: view[offset:offset + length].cast(typecode)
+        for name, (offset, length, typecode) in header["sections"].items()
+    }
+
+
+def read_sections(path):
+    """
+    Returns the header and memory-mapped sections of a file written by
+    write_sections, or None if it is missing or from another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < HEADER_SIZE or mapped[:len(MAGIC)] != MAGIC:
+        return None
+    length = int.from_bytes(mapped[len(MAGIC):len(MAGIC) + 4], "little")
+    start = len(MAGIC) + 4
+    try:
+        header = json.loads(mapped[start:start + length])
+    except ValueError:
+        return None
+    if (header.get("version") != SNAPSHOT_VERSION
+            or header.get("byteorder") != sys.byteorder):
+        return None
+    return header, section_views(header, mapped)
+
+
+def is_current(path, directory, header):
+    """
+    Returns whether a file written by write_sections still matches the
+    CSV files in directory. If only their mtimes moved, the file is
+    restamped so the next check does not need to hash them again.
+    """
+    status = _check_sources(directory, header.get("sources", {}))
+    if status == "touched":
+        header["sources"] = _fingerprint(directory)
+        try:
+            with open(path, "r+b") as f:
+                f.write(_encode_header(header))
+        except OSError:
+            pass
+    return status != "stale"
+
+
+def graph_from_sections(sections):
+    """
+    Builds a Graph whose arrays and strings are views into sections.
+    """
+    strings = {
+        name: StringTable(sections[f"{name}.offsets"], sections[f"{name}.data"])
+        for name in STRINGS
+    }
+    arrays = {name: sections[name] for name in ARRAYS}
+    return Graph(
+        **strings, **arrays,
+        person_index=SortedIndex(strings["person_ids"], sections["person_order"]),
+        movie_index=SortedIndex(strings["movie_ids"], sections["movie_order"]),
+        name_index=SortedIndex(strings["person_names"], sections["name_order"],
+                               unique=False, fold=True)
+    )
+
+
+def load_snapshot(directory):
+    """
+    Returns the graph for a data directory, memory-mapped from its
+    snapshot when that is still current and rebuilt from the CSV
+    files (refreshing the snapshot) when it is not.
+    """
+    path = snapshot_path(directory)
+    snapshot = read_sections(path)
+    if snapshot is not None:
+        header, sections = snapshot
+        if is_current(path, directory, header):
+            return graph_from_sections(sections)
+
+    graph = load_graph(directory)
+    try:
+        write_snapshot(graph, directory)
+    except OSError:
+        # Read-only data directories still work, just without the cache
+        pass
+    return graph
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    start = time.perf_counter()
+    graph = load_graph(directory)
+    write_snapshot(graph, directory)
+    print(f"Compiled {snapshot_path(directory)} "
+          f"in {time.perf_counter() - start:.3f} s")
+
+    start = time.perf_counter()
+    graph = load_snapshot(directory)
+    print(f"Loaded snapshot in {1000 * (time.perf_counter() - start):.3f} ms")
+
+    sizes = sorted(graph.component_sizes, reverse=True)
+    print(f"{len(sizes)} connected components, largest: {sizes[:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Alpha-beta search for Tic Tac Toe with a transposition table
+"""
+
+import tictactoe as ttt
+
+# Marker for an empty cell in a flattened board
+BLANK = "."
+
+# Flattened cell indices of every winning line
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+# Cells in the order moves are tried: center, corners, then edges
+ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+
+def _symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as the
+    list of cells that the transformed board reads its cells from.
+    """
+    rotate = [3 * (2 - j) + i for i in range(3) for j in range(3)]
+    reflect = [3 * i + (2 - j) for i in range(3) for j in range(3)]
+    perms = []
+    perm = list(range(9))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append([perm[k] for k in reflect])
+        perm = [perm[k] for k in rotate]
+    return perms
+
+
+SYMMETRIES = _symmetries()
+
+# Kinds of value kept in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Maps canonical positions to (kind, value) for the player to move
+table = {}
+
+# Positions visited by the last call to minimax
+nodes = 0
+
+
+def flatten(board):
+    """
+    Returns a board as a string of 9 cells, row by row.
+    """
+    return "".join(BLANK if cell is ttt.EMPTY else cell
+                   for row in board for cell in row)
+
+
+def canonical(cells):
+    """
+    Returns the same key for a position and all its rotations and reflections.
+    """
+    return min("".join([cells[k] for k in perm]) for perm in SYMMETRIES)
+
+
+def won(cells):
+    """
+    Returns True if either player has three in a row.
+    """
+    for a, b, c in LINES:
+        if cells[a] != BLANK and cells[a] == cells[b] == cells[c]:
+            return True
+    return False
+
+
+def negamax(cells, mark, alpha, beta):
+    """
+    Returns the value of a position to the player to move, mark:
+    1 for a win, -1 for a loss and 0 for a draw. Only values strictly
+    between alpha and beta are exact; outside that window the result
+    is just a bound on the value.
+    """
+    global nodes
+    nodes += 1
+
+    # The player who just moved is the only one who can have won
+    if won(cells):
+        return -1
+    if BLANK not in cells:
+        return 0
+
+    key = canonical(cells)
+    entry = table.get(key)
+    if entry is not None:
+        kind, value = entry
+        if kind == EXACT:
+            return value
+        if kind == LOWER and value > alpha:
+            alpha = value
+        elif kind == UPPER and value < beta:
+            beta = value
+        if alpha >= beta:
+            return value
+
+    original = alpha
+    best = -2
+    other = ttt.O if mark == ttt.X else ttt.X
+    for i in ORDER:
+        if cells[i] != BLANK:
+            continue
+        value = -negamax(cells[:i] + mark + cells[i + 1:], other, -beta, -alpha)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if best <= original:
+        table[key] = (UPPER, best)
+    elif best >= beta:
+        table[key] = (LOWER, best)
+    else:
+        table[key] = (EXACT, best)
+    return best
+
+
+def value(board):
+    """
+    Returns the value of a board with best play: 1 if X wins,
+    -1 if O wins, 0 for a draw.
+    """
+    if ttt.terminal(board):
+        return ttt.utility(board)
+    mark = ttt.player(board)
+    score = negamax(flatten(board), mark, -1, 1)
+    return score if mark == ttt.X else -score
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    global nodes
+    nodes = 0
+    if ttt.terminal(board):
+        return None
+
+    cells = flatten(board)
+    mark = ttt.player(board)
+    other = ttt.O if mark == ttt.X else ttt.X
+    best, move = -2, None
+    for i in ORDER:
+        if cells[i] != BLANK:
+            continue
+        # Only moves that beat the best so far need an exact value
+        score = -negamax(cells[:i] + mark + cells[i + 1:], other, -1, -best)
+        if score > best:
+            best, move = score, (i // 3, i % 3)
+            if best == 1:
+                break
+    return move
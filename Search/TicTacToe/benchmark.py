@@ -0,0 +1,143 @@
+import sys
+import time
+
+import alphabeta
+import bitboard
+import book
+import tictactoe as ttt
+
+
+def plain_minimax(board):
+    """
+    Returns the move tictactoe.minimax picks and the number of
+    positions it visited, counted by its calls to result.
+    """
+    result = ttt.result
+    count = 0
+
+    def counting_result(board, action):
+        nonlocal count
+        count += 1
+        return result(board, action)
+
+    ttt.result = counting_result
+    try:
+        move = ttt.minimax(board)
+    finally:
+        ttt.result = result
+    return move, count + 1
+
+
+def cold(module, engine):
+    """
+    Returns an engine that runs with an empty transposition table
+    in place of module's, leaving module's table as it was.
+    """
+    def search(board):
+        table = module.table
+        module.table = {}
+        try:
+            return engine(board)
+        finally:
+            module.table = table
+    return search
+
+
+def warm_alphabeta(board):
+    """
+    Returns the move alphabeta.minimax picks, and the positions it
+    visited, keeping whatever the transposition table already holds.
+    """
+    move = alphabeta.minimax(board)
+    return move, alphabeta.nodes
+
+
+def warm_bitboard(board):
+    """
+    Returns the move bitboard.minimax picks, and the positions it
+    visited, keeping whatever the transposition table already holds.
+    """
+    move = bitboard.minimax(bitboard.from_board(board))
+    return move, bitboard.nodes
+
+
+def book_move(board):
+    """
+    Returns the opening book's move, counting the lookup as one position.
+    """
+    return book.minimax(board), 1
+
+
+ENGINES = [
+    ("minimax", plain_minimax),
+    ("alpha-beta", cold(alphabeta, warm_alphabeta)),
+    ("alpha-beta, warm", warm_alphabeta),
+    ("bitboard", cold(bitboard, warm_bitboard)),
+    ("bitboard, warm", warm_bitboard),
+    ("book", book_move),
+]
+
+
+def benchmark_moves(opening):
+    """
+    Plays a game from the given opening moves, timing every engine on
+    each position and checking that their moves are equally good.
+    """
+    board = ttt.initial_state()
+    for move in opening:
+        board = ttt.result(board, move)
+
+    book.load_book()
+
+    # Solve the whole game once so warm searches start from a full table
+    for module, state in [(alphabeta, ttt.initial_state()),
+                          (bitboard, bitboard.initial_state())]:
+        module.table.clear()
+        start = time.perf_counter()
+        outcome = module.value(state)
+        elapsed = time.perf_counter() - start
+        print(f"{module.__name__} solved the game in {1000 * elapsed:.3f} ms: "
+              f"value {outcome}, {len(module.table)} positions in table")
+
+    print(f"{'move':>6}" + "".join(f"{name:>28}" for name, _ in ENGINES))
+    totals = {name: [0, 0.0] for name, _ in ENGINES}
+    number = len(opening)
+    while not ttt.terminal(board):
+        number += 1
+        moves = []
+        line = f"{number:>6}"
+        for name, engine in ENGINES:
+            start = time.perf_counter()
+            move, count = engine(board)
+            elapsed = time.perf_counter() - start
+            totals[name][0] += count
+            totals[name][1] += elapsed
+            moves.append(move)
+            line += f"{count:>10} nodes {1000 * elapsed:>9.3f} ms"
+        print(line)
+
+        values = {alphabeta.value(ttt.result(board, move)) for move in moves}
+        if len(values) != 1:
+            sys.exit(f"Engines disagree on {board}: {moves}")
+        board = ttt.result(board, moves[0])
+
+    line = f"{'total':>6}"
+    for name, _ in ENGINES:
+        count, elapsed = totals[name]
+        line += f"{count:>10} nodes {1000 * elapsed:>9.3f} ms"
+    print(line)
+    winner = ttt.winner(board)
+    print(f"Game over: {'tie' if winner is None else winner + ' wins'}")
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [opening]")
+
+    # Opening moves as cell numbers 0-8, row by row, e.g. "40"
+    opening = sys.argv[1] if len(sys.argv) > 1 else ""
+    benchmark_moves([(int(cell) // 3, int(cell) % 3) for cell in opening])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Tic Tac Toe on bitboards
+
+A state is a pair (x, o) of 9-bit masks of the cells each player
+holds, where cell (i, j) is bit 3 * i + j.
+"""
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+FULL = 0b111111111
+
+# Mask of the cells on each winning line
+WIN_MASKS = [0b000000111, 0b000111000, 0b111000000,
+             0b001001001, 0b010010010, 0b100100100,
+             0b100010001, 0b001010100]
+
+# Bits in the order moves are tried: center, corners, then edges
+ORDER = [1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7)]
+
+
+def _symmetry_tables():
+    """
+    Returns, for each of the 8 rotations and reflections of the board,
+    a table mapping every 9-bit mask to its transformed mask.
+    """
+    rotate = [3 * j + (2 - i) for i in range(3) for j in range(3)]
+    reflect = [3 * i + (2 - j) for i in range(3) for j in range(3)]
+    perms = []
+    perm = list(range(9))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append([reflect[k] for k in perm])
+        perm = [rotate[k] for k in perm]
+
+    tables = []
+    for perm in perms:
+        table = []
+        for mask in range(1 << 9):
+            moved = 0
+            for cell in range(9):
+                if mask >> cell & 1:
+                    moved |= 1 << perm[cell]
+            table.append(moved)
+        tables.append(table)
+    return tables
+
+
+SYMMETRY_TABLES = _symmetry_tables()
+
+# Kinds of value kept in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Maps canonical states to (kind, value) for the player to move
+table = {}
+
+# States visited by the last call to minimax
+nodes = 0
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the state of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board of a state.
+    """
+    x, o = state
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = state
+    free = FULL & ~(x | o)
+    return {(cell // 3, cell % 3) for cell in range(9) if free >> cell & 1}
+
+
+def result(state, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    bit = 1 << (3 * i + j)
+    x, o = state
+    if not (0 <= i <= 2 and 0 <= j <= 2) or (x | o) & bit:
+        raise Exception("Invalid Move!!!")
+    if player(state) == X:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def _won(mask):
+    """
+    Returns True if a player's mask covers a winning line.
+    """
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if _won(x):
+        return X
+    if _won(o):
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return (x | o) == FULL or _won(x) or _won(o)
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if _won(x):
+        return 1
+    if _won(o):
+        return -1
+    return 0
+
+
+def canonical(mine, theirs):
+    """
+    Returns the same key for a position and all its rotations and reflections.
+    """
+    return min((moved[mine] << 9) | moved[theirs] for moved in SYMMETRY_TABLES)
+
+
+def negamax(mine, theirs, alpha, beta):
+    """
+    Returns the value of a position to the player to move, who holds
+    mine: 1 for a win, -1 for a loss and 0 for a draw. Only values
+    strictly between alpha and beta are exact; outside that window
+    the result is just a bound on the value.
+    """
+    global nodes
+    nodes += 1
+
+    # The player who just moved is the only one who can have won
+    for line in WIN_MASKS:
+        if theirs & line == line:
+            return -1
+    if mine | theirs == FULL:
+        return 0
+
+    key = canonical(mine, theirs)
+    entry = table.get(key)
+    if entry is not None:
+        kind, value = entry
+        if kind == EXACT:
+            return value
+        if kind == LOWER and value > alpha:
+            alpha = value
+        elif kind == UPPER and value < beta:
+            beta = value
+        if alpha >= beta:
+            return value
+
+    original = alpha
+    best = -2
+    taken = mine | theirs
+    for bit in ORDER:
+        if taken & bit:
+            continue
+        value = -negamax(theirs, mine | bit, -beta, -alpha)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if best <= original:
+        table[key] = (UPPER, best)
+    elif best >= beta:
+        table[key] = (LOWER, best)
+    else:
+        table[key] = (EXACT, best)
+    return best
+
+
+def value(state):
+    """
+    Returns the value of a board with best play: 1 if X wins,
+    -1 if O wins, 0 for a draw.
+    """
+    if terminal(state):
+        return utility(state)
+    x, o = state
+    if player(state) == X:
+        return negamax(x, o, -1, 1)
+    return -negamax(o, x, -1, 1)
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    global nodes
+    nodes = 0
+    if terminal(state):
+        return None
+
+    x, o = state
+    mine, theirs = (x, o) if player(state) == X else (o, x)
+    best, move = -2, None
+    for bit in ORDER:
+        if (mine | theirs) & bit:
+            continue
+        # Only moves that beat the best so far need an exact value
+        score = -negamax(theirs, mine | bit, -1, -best)
+        if score > best:
+            cell = bit.bit_length() - 1
+            best, move = score, (cell // 3, cell % 3)
+            if best == 1:
+                break
+    return move
@@ -0,0 +1,205 @@
+"""
+Precomputed best moves for every Tic Tac Toe position
+
+Positions are stored once per class of rotations and reflections,
+keyed by bitboard.canonical, with the best move for the player to move
+in that canonical orientation.
+"""
+
+import os
+import sys
+import time
+from array import array
+
+import bitboard
+import tictactoe as ttt
+
+BOOK_NAME = "tictactoe.book"
+
+MAGIC = b"TTTBOOK1"
+
+# For each symmetry, maps a cell of the transformed board back to
+# the cell of the original board it came from
+INVERSE = [{(moved[1 << cell]).bit_length() - 1: cell for cell in range(9)}
+           for moved in bitboard.SYMMETRY_TABLES]
+
+# Maps canonical keys to the canonical cell to play, once loaded
+_book = None
+
+
+def book_path():
+    """
+    Returns where the opening book is kept.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), BOOK_NAME)
+
+
+def _orient(mine, theirs):
+    """
+    Returns the canonical key of a position and the
+    symmetry that maps the position onto it.
+    """
+    return min(((moved[mine] << 9) | moved[theirs], symmetry)
+               for symmetry, moved in enumerate(bitboard.SYMMETRY_TABLES))
+
+
+def _best_cell(mine, theirs):
+    """
+    Returns the best cell for the player to move, who holds mine,
+    preferring cells in bitboard.ORDER among equally good ones.
+    """
+    best, cell = -2, None
+    for bit in bitboard.ORDER:
+        if (mine | theirs) & bit:
+            continue
+        score = -bitboard.negamax(theirs, mine | bit, -1, -best)
+        if score > best:
+            best, cell = score, bit.bit_length() - 1
+            if best == 1:
+                break
+    return cell
+
+
+def positions():
+    """
+    Yields (mine, theirs) for every reachable position,
+    where mine belongs to the player to move.
+    """
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        mine, theirs = stack.pop()
+        if (mine, theirs) in seen:
+            continue
+        seen.add((mine, theirs))
+        yield mine, theirs
+        if bitboard.terminal((mine, theirs)):
+            continue
+        for bit in bitboard.ORDER:
+            if not (mine | theirs) & bit:
+                stack.append((theirs, mine | bit))
+
+
+def build_book():
+    """
+    Returns a dict mapping the canonical key of every reachable
+    non-terminal position to its best canonical cell.
+    """
+    book = {}
+    for mine, theirs in positions():
+        if bitboard.terminal((mine, theirs)):
+            continue
+        key, _ = _orient(mine, theirs)
+        if key not in book:
+            book[key] = _best_cell(key >> 9, key & 0b111111111)
+    return book
+
+
+def save_book(book, path):
+    """
+    Writes a book as a sorted array of key << 4 | cell entries.
+    """
+    entries = array("I", sorted(key << 4 | cell for key, cell in book.items()))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        entries.tofile(f)
+
+
+def read_book(path):
+    """
+    Returns the book saved at path, or None if there is none.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            entries = array("I", f.read())
+    except (OSError, ValueError):
+        return None
+    return {entry >> 4: entry & 0b1111 for entry in entries}
+
+
+def load_book():
+    """
+    Returns the opening book, reading it on first use and building
+    (and saving) it if there is no saved copy.
+    """
+    global _book
+    if _book is None:
+        path = book_path()
+        book = read_book(path)
+        if book is None:
+            book = build_book()
+            try:
+                save_book(book, path)
+            except OSError:
+                pass
+        _book = book
+    return _book
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    looked up in the opening book.
+    """
+    state = bitboard.from_board(board)
+    if bitboard.terminal(state):
+        return None
+    x, o = state
+    mine, theirs = (x, o) if bitboard.player(state) == ttt.X else (o, x)
+    key, symmetry = _orient(mine, theirs)
+    cell = load_book().get(key)
+    if cell is None:
+        return bitboard.minimax(state)
+    cell = INVERSE[symmetry][cell]
+    return (cell // 3, cell % 3)
+
+
+def check_book(book):
+    """
+    Returns the boards, if any, where the book's move is
+    worse than the best move found by search.
+    """
+    wrong = []
+    for mine, theirs in positions():
+        state = (mine, theirs)
+        if bitboard.terminal(state):
+            continue
+        if bitboard.player(state) == ttt.O:
+            state = (theirs, mine)
+        board = bitboard.to_board(state)
+        move = minimax(board)
+        if move is None or board[move[0]][move[1]] is not ttt.EMPTY:
+            wrong.append(board)
+            continue
+        played = bitboard.value(bitboard.result(state, move))
+        if played != bitboard.value(state):
+            wrong.append(board)
+    return wrong
+
+
+def main():
+    if len(sys.argv) > 1:
+        sys.exit("Usage: python book.py")
+
+    global _book
+    start = time.perf_counter()
+    _book = build_book()
+    save_book(_book, book_path())
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {len(_book)} positions to {BOOK_NAME} "
+          f"({os.path.getsize(book_path())} bytes) in {1000 * elapsed:.3f} ms")
+
+    canonical = {_orient(mine, theirs)[0] for mine, theirs in positions()}
+    print(f"{len(canonical)} distinct positions including finished games")
+
+    _book = read_book(book_path())
+    wrong = check_book(_book)
+    if wrong:
+        sys.exit(f"Book disagrees with search on {len(wrong)} positions")
+    print("Every book move is as good as the searched best move.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Iterative-deepening search for m,n,k-games
+
+Tic Tac Toe on a board of m rows and n columns where the first player
+to get k in a row wins. Exhaustive search is hopeless beyond 3x3, so
+each move searches one ply deeper at a time until a time budget runs
+out, scoring positions at the depth limit with a heuristic.
+"""
+
+import sys
+import time
+
+import tictactoe as ttt
+
+# Score of a win; wins sooner score higher
+WIN = 10 ** 9
+
+# Maps (rows, cols, k) to the number of lines of k through each cell
+_weights = {}
+
+
+class TimeUp(Exception):
+    """
+    Raised inside a search when its deadline has passed
+    or it has been told to stop.
+    """
+    pass
+
+
+def evaluate(board, k):
+    """
+    Returns a heuristic score of a board for X: each line of k cells
+    still open to only one player counts for that player, more the
+    more of its cells they already hold.
+    """
+    score = 0
+    for line in ttt.lines(len(board), len(board[0]), k):
+        xs = os = 0
+        for i, j in line:
+            cell = board[i][j]
+            if cell == ttt.X:
+                xs += 1
+            elif cell == ttt.O:
+                os += 1
+        if xs and not os:
+            score += 4 ** xs
+        elif os and not xs:
+            score -= 4 ** os
+    return score
+
+
+def completes(board, i, j, k):
+    """
+    Returns True if the mark at (i, j) is part of k in a row.
+    """
+    return ttt.longest_run(board, i, j) >= k
+
+
+def ordered_actions(board, k, first=None):
+    """
+    Returns the empty cells of a board, those on the most lines of k
+    first, with first, if given, ahead of all of them.
+    """
+    size = (len(board), len(board[0]), k)
+    if size not in _weights:
+        weight = {}
+        for line in ttt.lines(*size):
+            for cell in line:
+                weight[cell] = weight.get(cell, 0) + 1
+        _weights[size] = weight
+    weight = _weights[size]
+    moves = sorted(ttt.actions(board), key=lambda cell: (-weight.get(cell, 0), cell))
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+def negamax(board, mark, depth, alpha, beta, k, deadline, ply, stop=None):
+    """
+    Returns the score of a board for mark, the player to move, searching
+    depth more moves and scoring the positions there with evaluate.
+    The board is changed during the search but restored before returning.
+    """
+    if time.perf_counter() > deadline or (stop is not None and stop.is_set()):
+        raise TimeUp
+
+    moves = ordered_actions(board, k)
+    if not moves:
+        return 0
+    if depth == 0:
+        score = evaluate(board, k)
+        return score if mark == ttt.X else -score
+
+    other = ttt.O if mark == ttt.X else ttt.X
+    best = -WIN - 1
+    for i, j in moves:
+        board[i][j] = mark
+        if completes(board, i, j, k):
+            score = WIN - ply
+        else:
+            score = -negamax(board, other, depth - 1, -beta, -alpha,
+                             k, deadline, ply + 1, stop)
+        board[i][j] = ttt.EMPTY
+        if score > best:
+            best = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+    return best
+
+
+def search(board, k=3, budget=1.0, stop=None):
+    """
+    Returns (move, depth, score) for the player to move: the best move
+    found by the deepest search finished within budget seconds, how many
+    moves ahead that search looked and its score for the player.
+
+    If stop, a threading.Event, is set while searching,
+    the best move found so far is returned at once.
+    """
+    deadline = time.perf_counter() + budget
+    if ttt.terminal(board, k):
+        return None, 0, 0
+
+    board = [row[:] for row in board]
+    mark = ttt.player(board)
+    other = ttt.O if mark == ttt.X else ttt.X
+    moves = ordered_actions(board, k)
+    best_move, best_depth, best_score = moves[0], 0, 0
+    for depth in range(1, len(moves) + 1):
+        try:
+            move, alpha = None, -WIN - 1
+            for i, j in ordered_actions(board, k, best_move):
+                board[i][j] = mark
+                if completes(board, i, j, k):
+                    score = WIN - 1
+                else:
+                    score = -negamax(board, other, depth - 1, -WIN - 1, -alpha,
+                                     k, deadline, 2, stop)
+                board[i][j] = ttt.EMPTY
+                if score > alpha:
+                    move, alpha = (i, j), score
+        except TimeUp:
+            break
+        best_move, best_depth, best_score = move, depth, alpha
+
+        # Stop once the outcome is certain
+        if abs(best_score) > WIN // 2:
+            break
+    return best_move, best_depth, best_score
+
+
+def best_move(board, k=3, budget=1.0, stop=None):
+    """
+    Returns the best move found for the player to move within budget seconds.
+    """
+    return search(board, k, budget, stop)[0]
+
+
+def main():
+    if len(sys.argv) < 4 or len(sys.argv) > 5:
+        sys.exit("Usage: python mnk.py rows cols k [budget]")
+    rows, cols, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    # Play the engine against itself, printing each move
+    board = ttt.initial_state(rows, cols)
+    while not ttt.terminal(board, k):
+        start = time.perf_counter()
+        move, depth, score = search(board, k, budget)
+        elapsed = time.perf_counter() - start
+        print(f"{ttt.player(board)} plays {move} after {1000 * elapsed:.1f} ms "
+              f"(depth {depth}, score {score})")
+        board = ttt.result(board, move)
+
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    winner = ttt.winner(board, k)
+    print(f"Game over: {'tie' if winner is None else winner + ' wins'}")
+
+
+if __name__ == "__main__":
+    main()
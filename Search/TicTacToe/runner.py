@@ -1,7 +1,11 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import book
+import mnk
 import tictactoe as ttt
 
 pygame.init()
@@ -17,14 +21,49 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Seconds the computer may think, and the least it appears to think
+AI_BUDGET = 2.0
+AI_DELAY = 0.5
+
+clock = pygame.time.Clock()
+
+# The computer searches in the background so the window stays responsive
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+ai_stop = None
+ai_start = None
+
+
+def think(board, stop):
+    """
+    Returns the computer's move: the opening book's on the standard
+    board, otherwise the best found before the budget runs out.
+    """
+    if len(board) == 3 and len(board[0]) == 3:
+        return book.minimax(board)
+    return mnk.best_move(board, budget=AI_BUDGET, stop=stop)
+
+
+def cancel_ai():
+    """
+    Stops any search in progress and forgets its move.
+    """
+    global ai_move, ai_stop
+    if ai_stop is not None:
+        ai_stop.set()
+    ai_move = None
+    ai_stop = None
+
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_ai()
+            executor.shutdown(wait=False)
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +141,22 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(2 * (time.time() - (ai_start or time.time()))) % 3 + 1
+            title = "Computer thinking" + "." * dots
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI's search, and play its move once it is ready
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_stop = threading.Event()
+                ai_start = time.time()
+                ai_move = executor.submit(think, board, ai_stop)
+            elif ai_move.done() and time.time() - ai_start >= AI_DELAY:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +181,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    cancel_ai()
 
     pygame.display.flip()
+    clock.tick(30)
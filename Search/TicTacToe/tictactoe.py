@@ -3,28 +3,100 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Maps (rows, cols, k) to the cells of every line of k on such a board
+_lines = {}
 
-def initial_state():
+
+class Board(list):
+    """
+    Board that remembers how it was played: how many moves have been
+    made, and for each length, which player first got that many in a
+    row (first_run[n - 1] for n in a row). result keeps these up to
+    date from the last move alone, so winner, terminal and player need
+    not scan the board. Boards should only be changed through result.
+    """
+
+    def __init__(self, rows, moves=0, first_run=()):
+        super().__init__(rows)
+        self.moves = moves
+        self.first_run = list(first_run)
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return Board([EMPTY] * cols for _ in range(rows))
+
+
+def longest_run(board, i, j):
+    """
+    Returns the length of the longest line of the same
+    mark through (i, j) in any direction.
+    """
+    mark = board[i][j]
+    rows, cols = len(board), len(board[0])
+    longest = 0
+    for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        count = 1
+        for sign in (1, -1):
+            r, c = i + sign * di, j + sign * dj
+            while 0 <= r < rows and 0 <= c < cols and board[r][c] == mark:
+                count += 1
+                r, c = r + sign * di, c + sign * dj
+        longest = max(longest, count)
+    return longest
+
+
+def _as_board(board):
+    """
+    Returns a Board for a plain list-of-lists board by scanning it,
+    or the board itself if it is already one. Where both players
+    have runs of the same length, X is taken to have got there first.
+    """
+    if isinstance(board, Board):
+        return board
+    longest = {X: 0, O: 0}
+    moves = 0
+    for i in range(len(board)):
+        for j in range(len(board[i])):
+            if board[i][j] is not EMPTY:
+                moves += 1
+                longest[board[i][j]] = max(longest[board[i][j]], longest_run(board, i, j))
+    first_run = [X if longest[X] >= n else O
+                 for n in range(1, max(longest.values()) + 1)]
+    return Board(board, moves, first_run)
+
+
+def lines(rows, cols, k=3):
+    """
+    Returns the cells of every horizontal, vertical and diagonal
+    line of k cells on a board of the given size.
+    """
+    if (rows, cols, k) not in _lines:
+        found = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    endI = i + (k - 1) * di
+                    endJ = j + (k - 1) * dj
+                    if 0 <= endI < rows and 0 <= endJ < cols:
+                        found.append(tuple((i + n * di, j + n * dj) for n in range(k)))
+        _lines[(rows, cols, k)] = found
+    return _lines[(rows, cols, k)]
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    if board == initial_state():
-        return X
+    if isinstance(board, Board):
+        return X if board.moves % 2 == 0 else O
 
     numX = 0
     numO = 0
@@ -32,7 +104,7 @@ def player(board):
         numX += row.count(X)
         numO += row.count(O)
     
-    if (numX == 0 and numO == 0) or (numO > numX):
+    if numX <= numO:
         return X
     else:
         return O
@@ -44,8 +116,8 @@ def actions(board):
     """
     moves = set()
 
-    for row in range(3):
-        for col in range(3):
+    for row in range(len(board)):
+        for col in range(len(board[row])):
             if board[row][col] == EMPTY:
                 moves.add((row, col))
     
@@ -57,41 +129,51 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if (action[0] < 0) or (action[0] > 2) or action[1] < 0 or action[1] > 2 or board[action[0]][action[1]] is not EMPTY:
+    if (action[0] < 0) or (action[0] >= len(board)) or action[1] < 0 or action[1] >= len(board[0]) or board[action[0]][action[1]] is not EMPTY:
         raise Exception("Invalid Move!!!")
 
-    newBoard = copy.deepcopy(board)
-    newBoard[action[0]][action[1]] = player(board)
+    board = _as_board(board)
+    i, j = action
+    mark = player(board)
+    newBoard = Board([row[:] for row in board], board.moves + 1, board.first_run)
+    newBoard[i][j] = mark
+
+    # Only lines through the new mark can have grown
+    run = longest_run(newBoard, i, j)
+    while len(newBoard.first_run) < run:
+        newBoard.first_run.append(mark)
 
     return newBoard
 
 
-def winner(board):
+def winner(board, k=3):
     """
-    Returns the winner of the game, if there is one.
+    Returns the winner of the game, the first player
+    with k in a row, if there is one.
     """
-    for symbol in [X,O]:
-        for i in range(0,3):
-            if all(board[i][j] == symbol for j in range(0,3)):
-                return symbol
+    if isinstance(board, Board):
+        if len(board.first_run) >= k:
+            return board.first_run[k - 1]
+        return None
+
+    for line in lines(len(board), len(board[0]), k):
+        i, j = line[0]
+        symbol = board[i][j]
+        if symbol is not EMPTY and all(board[i][j] == symbol for (i, j) in line):
+            return symbol
 
-            if all(board[j][i] == symbol for j in range(0,3)):
-                return symbol
-            
-        diag = [[(0,0), (1,1), (2,2)], [(0,2), (1,1), (2,0)]] 
-        for options in diag:
-            if all(board[i][j] == symbol for (i,j) in options):
-                return symbol
-    
     return None
 
 
-def terminal(board):
+def terminal(board, k=3):
     """
     Returns True if game is over, False otherwise.
     """    
-    if winner(board) is not None:
+    if winner(board, k) is not None:
         return True
+
+    if isinstance(board, Board):
+        return board.moves == len(board) * len(board[0])
      
     cellsArr = [cells for row in board for cells in row]
     if not any(cell == EMPTY for cell in cellsArr):
@@ -101,19 +183,14 @@ def terminal(board):
             
 
 
-def utility(board):
+def utility(board, k=3):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    numX = 0
-    numO = 0
-    for row in board:
-        numX += row.count(X)
-        numO += row.count(O)
-    
-    if(numX > numO):
+    win = winner(board, k)
+    if win == X:
         return 1
-    elif(numO > numX):
+    elif win == O:
         return -1
     else:
         return 0
@@ -123,6 +200,9 @@ def utility(board):
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
+
+    This searches every remaining game, so it is only practical on the
+    3x3 board; see mnk.py for larger boards.
     """
     if terminal(board):
         return None
@@ -131,7 +211,7 @@ def minimax(board):
     if player(board) == X:
         maxValue = -math.inf
         for moves in acceptableMoves:
-          value = min_Value(result(board. moves))
+          value = min_Value(result(board, moves))
           if value > maxValue:
               maxValue = value
               desiredMove = moves
@@ -0,0 +1,189 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import alphabeta
+import bitboard
+import tictactoe as ttt
+from benchmark import book_move, plain_minimax, warm_alphabeta, warm_bitboard
+
+# Seeded so that tournaments with the random engine can be repeated
+_random = random.Random(50)
+
+
+def random_move(board):
+    """
+    Returns a random legal move, counting the choice as one position.
+    """
+    return _random.choice(sorted(ttt.actions(board))), 1
+
+
+# Maps engine names to (engine, whether it should play perfectly)
+ENGINES = {
+    "minimax": (plain_minimax, True),
+    "alphabeta": (warm_alphabeta, True),
+    "bitboard": (warm_bitboard, True),
+    "book": (book_move, True),
+    "random": (random_move, False),
+}
+
+
+def solve():
+    """
+    Returns a dict mapping every reachable (x, o) bitboard state to
+    its value with best play, 1 if X wins, -1 if O wins, 0 for a draw.
+    """
+    values = {}
+
+    def value(state):
+        if state not in values:
+            if bitboard.terminal(state):
+                values[state] = bitboard.utility(state)
+            else:
+                children = [value(bitboard.result(state, action))
+                            for action in bitboard.actions(state)]
+                if bitboard.player(state) == ttt.X:
+                    values[state] = max(children)
+                else:
+                    values[state] = min(children)
+        return values[state]
+
+    value(bitboard.initial_state())
+    return values
+
+
+def random_opening(values):
+    """
+    Returns a board after one or two random legal moves, so that games
+    between deterministic engines still differ.
+    """
+    board = ttt.initial_state()
+    for _ in range(_random.choice([1, 2])):
+        board = ttt.result(board, _random.choice(sorted(ttt.actions(board))))
+    if bitboard.from_board(board) not in values:
+        raise Exception(f"opening {board} is not a reachable position")
+    return board
+
+
+def play(x_name, o_name, board, values, latencies, positions):
+    """
+    Plays out a game from board, returning the winner or None for a tie
+    and the moves made. Each move's latency and positions searched are
+    added to the engine's entries in latencies and positions. Raises an
+    exception if an engine that should play perfectly makes a move that
+    worsens its outcome.
+    """
+    moves = []
+    while not ttt.terminal(board):
+        mark = ttt.player(board)
+        name = x_name if mark == ttt.X else o_name
+        engine, perfect = ENGINES[name]
+
+        start = time.perf_counter()
+        move, count = engine(board)
+        elapsed = time.perf_counter() - start
+        latencies[name].append(elapsed)
+        positions[name] += count
+
+        before = values[bitboard.from_board(board)]
+        board = ttt.result(board, move)
+        moves.append(move)
+        after = values[bitboard.from_board(board)]
+        if perfect and before != after:
+            raise Exception(f"{name} played {move} as {mark}, "
+                            f"changing the outcome from {before} to {after}")
+    return ttt.winner(board), moves
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which a fraction of sorted values fall.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def peak_memory(name):
+    """
+    Returns the most memory, in bytes, that one move of an engine
+    allocated, over a game against itself.
+    """
+    engine, _ = ENGINES[name]
+    peak = 0
+    board = ttt.initial_state()
+    tracemalloc.start()
+    try:
+        while not ttt.terminal(board):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            move, _ = engine(board)
+            _, move_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, move_peak - current)
+            board = ttt.result(board, move)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def tournament(names, games):
+    """
+    Plays games games between every ordered pair of engines, each taking
+    X and O in turn, then reports results, throughput, latency and memory.
+    Each game starts from a random opening of one or two moves.
+    """
+    values = solve()
+    alphabeta.table.clear()
+    bitboard.table.clear()
+
+    latencies = {name: [] for name in names}
+    positions = {name: 0 for name in names}
+    outcomes = {1: ttt.X, -1: ttt.O, 0: None}
+    print(f"{'X':>10} {'O':>10} {'X wins':>8} {'O wins':>8} {'ties':>8} "
+          f"{'distinct':>9}")
+    for x_name in names:
+        for o_name in names:
+            tally = {ttt.X: 0, ttt.O: 0, None: 0}
+            distinct = set()
+            for _ in range(games):
+                board = random_opening(values)
+                expected = outcomes[values[bitboard.from_board(board)]]
+                winner, moves = play(x_name, o_name, board, values,
+                                     latencies, positions)
+                tally[winner] += 1
+                distinct.add((str(board), tuple(moves)))
+
+                # Perfect play must reach the outcome the opening allows
+                if ENGINES[x_name][1] and ENGINES[o_name][1] and winner != expected:
+                    raise Exception(f"{x_name} against {o_name} from {board} "
+                                    f"ended in {winner}, not {expected}")
+            print(f"{x_name:>10} {o_name:>10} {tally[ttt.X]:>8} "
+                  f"{tally[ttt.O]:>8} {tally[None]:>8} {len(distinct):>9}")
+
+    print()
+    print(f"{'engine':>10} {'moves':>8} {'positions/s':>12} {'p50':>10} "
+          f"{'p90':>10} {'p99':>10} {'max':>10} {'peak memory':>12}")
+    for name in names:
+        times = sorted(latencies[name])
+        rate = positions[name] / sum(times) if sum(times) else float("inf")
+        memory = peak_memory(name)
+        print(f"{name:>10} {len(times):>8} {rate:>12.0f} "
+              + " ".join(f"{1000 * percentile(times, f):>7.3f} ms"
+                         for f in (0.5, 0.9, 0.99, 1))
+              + f" {memory / 1024:>9.1f} KB")
+    print("Every move by a perfect engine kept the game's outcome.")
+
+
+def main():
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        sys.exit("Usage: python tournament.py [games] [engine ...]\n"
+                 f"Engines: {', '.join(ENGINES)}")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    names = sys.argv[2:] or ["alphabeta", "bitboard", "book", "random"]
+    for name in names:
+        if name not in ENGINES:
+            sys.exit(f"Unknown engine {name}; choose from {', '.join(ENGINES)}")
+    tournament(names, games)
+
+
+if __name__ == "__main__":
+    main()